@@ -24,10 +24,14 @@ embedding_database_file = root_path / "src" / "data" / "embeddings.json"
 embedding_database_file.unlink(missing_ok=True)
 print(f"Removed existing embeddings.json at {embedding_database_file}")
 
-async def process_data(text, embedding_service, database):
-    print(f"Processing: {text[:50]}...")
-    embedding = await embedding_service.embed(text=text)
-    await database.insert(text=text, embeddings=embedding)
+# Maximum number of embedding requests in flight at once
+MAX_CONCURRENCY = 8
+
+async def process_data(text, embedding_service, database, semaphore):
+    async with semaphore:
+        print(f"Processing: {text[:50]}...")
+        embedding = await embedding_service.embed(text=text)
+        await database.insert(text=text, embeddings=embedding)
 
 async def main():
     print("Starting to refresh embeddings...")
@@ -42,9 +46,10 @@ async def main():
     
     print(f"Found {len(data)} sentences to process")
     
-    for i, text in enumerate(data):
-        print(f"[{i+1}/{len(data)}] ", end="")
-        await process_data(text, embedding_service, database)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    await asyncio.gather(
+        *(process_data(text, embedding_service, database, semaphore) for text in data)
+    )
     
     print("Done! Embeddings refreshed.")
 
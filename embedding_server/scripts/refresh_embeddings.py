@@ -2,7 +2,11 @@
 """Script to regenerate embeddings.json from sentences.txt"""
 import json
 import hashlib
+import os
 from pathlib import Path
+
+import numpy as np
+import pandas as pd
 from sentence_transformers import SentenceTransformer
 
 # Paths
@@ -10,14 +14,30 @@ SCRIPT_DIR = Path(__file__).parent
 ROOT_DIR = SCRIPT_DIR.parent
 SENTENCES_FILE = ROOT_DIR / "data" / "sentences.txt"
 EMBEDDINGS_FILE = ROOT_DIR / "src" / "data" / "embeddings.json"
+# Binary sidecars memory-mapped by VectorSearchDatabase on startup
+MATRIX_FILE = EMBEDDINGS_FILE.with_suffix(".npy")
+METADATA_FILE = EMBEDDINGS_FILE.with_suffix(".parquet")
+
+# Sentences per forward pass
+BATCH_SIZE = 64
+
+# Inference backend: "torch" (default), "onnx" or "openvino". The ONNX backend
+# needs sentence-transformers[onnx]; EMBEDDING_MODEL_FILE selects a specific
+# export such as "onnx/model_qint8_avx512_vnni.onnx" for int8 on x86 CPUs.
+BACKEND = os.environ.get("EMBEDDING_BACKEND", "torch")
+MODEL_FILE = os.environ.get("EMBEDDING_MODEL_FILE")
 
 def generate_id(text: str) -> str:
     """Generate SHA256 hash ID for text."""
     return hashlib.sha256(text.encode()).hexdigest()
 
 def main():
-    print("Loading sentence transformer model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    print(f"Loading sentence transformer model ({BACKEND} backend)...")
+    if BACKEND == "torch":
+        import torch
+        torch.set_num_threads(os.cpu_count() or 1)
+    model_kwargs = {"file_name": MODEL_FILE} if MODEL_FILE else None
+    model = SentenceTransformer('all-MiniLM-L6-v2', backend=BACKEND, model_kwargs=model_kwargs)
     
     print(f"Reading sentences from {SENTENCES_FILE}")
     with open(SENTENCES_FILE, 'r') as f:
@@ -25,21 +45,23 @@ def main():
     
     print(f"Found {len(sentences)} sentences")
     
-    # Generate embeddings
-    embeddings_data = []
-    for i, sentence in enumerate(sentences):
-        print(f"[{i+1}/{len(sentences)}] Embedding: {sentence[:50]}...")
-        
-        # Generate embedding
-        embedding = model.encode(sentence).tolist()
-        
-        # Create record
-        record = {
+    # Generate embeddings in batches rather than one forward pass per sentence
+    matrix = model.encode(
+        sentences,
+        batch_size=BATCH_SIZE,
+        show_progress_bar=True,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    ).astype(np.float32)
+    
+    embeddings_data = [
+        {
             "ID": generate_id(sentence),
             "Text": sentence,
-            "Embeddings": embedding
+            "Embeddings": embedding.tolist()
         }
-        embeddings_data.append(record)
+        for sentence, embedding in zip(sentences, matrix)
+    ]
     
     # Save to JSON
     print(f"Saving to {EMBEDDINGS_FILE}")
@@ -48,6 +70,13 @@ def main():
     with open(EMBEDDINGS_FILE, 'w') as f:
         json.dump(embeddings_data, f, indent=2)
     
+    # Written after the JSON so the server sees them as up to date
+    print(f"Saving search matrix to {MATRIX_FILE}")
+    np.save(MATRIX_FILE, matrix)  # already L2-normalized by encode
+    pd.DataFrame(
+        {"ID": [r["ID"] for r in embeddings_data], "Text": [r["Text"] for r in embeddings_data]}
+    ).to_parquet(METADATA_FILE, index=False)
+    
     print(f"Done! Saved {len(embeddings_data)} embeddings")
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+"""Micro-batching of concurrent embedding requests."""
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+
+from embedding_server.gibson.embedding import AsyncEmbeddingService
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests into batched service calls.
+
+    Texts submitted within ``max_wait`` seconds of each other (or until
+    ``max_batch_size`` texts are pending) are embedded with one call to
+    the embedding service, and each caller receives its own embedding.
+    """
+
+    def __init__(
+        self,
+        embedding_service: AsyncEmbeddingService,
+        max_batch_size: int = 32,
+        max_wait: float = 0.005
+    ):
+        """Initialize the batcher.
+
+        Args:
+            embedding_service: Service used to generate the embeddings.
+            max_batch_size: Maximum number of texts sent in one request.
+            max_wait: Seconds to wait for more texts before sending a batch.
+        """
+        self.embedding_service = embedding_service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, asyncio.Future[List[float]]]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task[None]] = set()
+
+    async def submit(self, text: str) -> List[float]:
+        """Queue a text for embedding and wait for its batch to complete.
+
+        Args:
+            text: Text to embed.
+
+        Returns:
+            Embedding vector.
+
+        Raises:
+            FlakyNetworkException: If the batch request hits a network error.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[List[float]] = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Send all pending texts as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        # Callers cancelled while waiting no longer need an embedding
+        batch = [(text, future) for text, future in self._pending if not future.done()]
+        self._pending = []
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._embed_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _embed_batch(
+        self,
+        batch: List[Tuple[str, asyncio.Future[List[float]]]]
+    ) -> None:
+        """Embed a batch of texts and resolve each caller's future.
+
+        Args:
+            batch: Pending (text, future) pairs.
+        """
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        logger.debug(f"Embedding batch of {len(texts)} texts")
+
+        try:
+            if len(texts) == 1:
+                embeddings = [await self.embedding_service.embed(texts[0])]
+            else:
+                embeddings = await self.embedding_service.embed_batch(texts)
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        by_text = dict(zip(texts, embeddings))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
@@ -1,15 +1,26 @@
 """Provides an asynchronous API interaction for a simulated remote vector database."""
 
+import asyncio
 import hashlib
 import logging
 import os
+import stat
+import tempfile
+from collections.abc import Callable
 from pathlib import Path
+from typing import IO, Any
 
+import numpy as np
+import orjson
 import pandas as pd
 
 logging.basicConfig(level=logging.DEBUG if "DEBUG" in os.environ else logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Process umask, read once at import since reading it means briefly changing it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 
 class AsyncEmbeddingDatabase:
     """Provides asynchronous API interaction for a simulated remote vector database."""
@@ -21,6 +32,7 @@ class AsyncEmbeddingDatabase:
             cache_path: Path to the cache file where the database is stored.
         """
         self.cache_path = cache_path
+        self._save_lock = asyncio.Lock()
 
     async def setup(self) -> None:
         """Asynchronously initializes the database structure."""
@@ -37,6 +49,8 @@ class AsyncEmbeddingDatabase:
     async def _read_json(path: Path) -> pd.DataFrame:
         """Asynchronously reads JSON file.
 
+        Parsing runs in a worker thread so it does not block the event loop.
+
         Args:
             path: The path to the JSON file to read.
 
@@ -44,20 +58,114 @@ class AsyncEmbeddingDatabase:
             A pandas DataFrame containing the database data.
         """
         logger.debug(f"Reading JSON file from {path}.")
-        return pd.read_json(path)
+        return await asyncio.to_thread(AsyncEmbeddingDatabase._parse_json, path)
+
+    @staticmethod
+    def _parse_json(path: Path) -> pd.DataFrame:
+        """Parses a database JSON file into a DataFrame.
+
+        Args:
+            path: The path to the JSON file to read.
+
+        Returns:
+            A pandas DataFrame containing the database data.
+        """
+        return pd.DataFrame(
+            AsyncEmbeddingDatabase._parse_columns(path), columns=["ID", "Text", "Embeddings"]
+        )
+
+    @staticmethod
+    def _parse_columns(path: Path) -> dict[str, list[Any]]:
+        """Parses a database JSON file with orjson into plain columns.
+
+        Accepts the column layout written by ``_save``, the index-keyed column
+        layout of ``DataFrame.to_json`` and a list of records as written by
+        ``scripts/refresh_embeddings.py``.
+
+        Args:
+            path: The path to the JSON file to read.
+
+        Returns:
+            Mapping of column name to its values.
+        """
+        content = orjson.loads(path.read_bytes())
+        columns = {}
+        for column in ("ID", "Text", "Embeddings"):
+            if isinstance(content, list):
+                values = [record[column] for record in content]
+            else:
+                values = content.get(column, [])
+            columns[column] = list(values.values()) if isinstance(values, dict) else values
+        return columns
 
     async def _save(self) -> None:
-        """Saves the database to JSON asynchronously."""
+        """Saves the database to JSON asynchronously.
+
+        Serialization with orjson and the file write run in a worker thread so
+        other requests keep being served. Saves are serialized and each one
+        snapshots the data once it holds the lock, so a later save never
+        writes older data than an earlier one.
+        """
         logger.info(f"Saving database to JSON at {self.cache_path=}.")
-        self.data.to_json(self.cache_path, index=False)
+        async with self._save_lock:
+            columns = self._json_columns()
+            await asyncio.to_thread(self._write_json, columns)
         logger.debug("Database saved.")
 
-    async def insert(self, text: str, embeddings: list[float]) -> None:
+    def _json_columns(self) -> dict[str, Any]:
+        """Returns the columns to save.
+
+        Called on the event loop, so the worker thread writes one consistent
+        snapshot even if entries are inserted while it runs.
+
+        Returns:
+            Mapping of column name to its values.
+        """
+        return {column: self.data[column].tolist() for column in ("ID", "Text", "Embeddings")}
+
+    def _write_json(self, columns: dict[str, Any]) -> None:
+        """Writes the columns to the JSON file.
+
+        Args:
+            columns: Mapping of column name to its values.
+        """
+        payload = orjson.dumps(columns, option=orjson.OPT_SERIALIZE_NUMPY)
+        self._replace_file(self.cache_path, lambda file: file.write(payload))
+
+    @staticmethod
+    def _replace_file(path: Path, write: Callable[[IO[bytes]], Any]) -> None:
+        """Atomically replaces a file so readers never see partial data.
+
+        The content is written to a uniquely named temporary file in the same
+        directory, which is then renamed over the target. The replacement keeps
+        the target's permissions, or gets the umask's default for a new file,
+        rather than the owner-only mode of the temporary file.
+
+        Args:
+            path: The file to replace.
+            write: Writes the new content to the given binary file.
+        """
+        try:
+            mode = stat.S_IMODE(path.stat().st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                os.fchmod(file.fileno(), mode)
+                write(file)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    async def insert(self, text: str, embeddings: list[float] | np.ndarray[Any, np.dtype[np.float32]]) -> None:
         """Inserts a new entry into the database asynchronously.
 
         Args:
             text: The input text corresponding to the embeddings.
-            embeddings: The embeddings list to be stored.
+            embeddings: The embeddings, as a list or float32 array, to be stored.
 
         Raises:
             ValueError: If an entry with the generated id already exists or if the embeddings have incorrect dimensions.
@@ -68,7 +176,7 @@ class AsyncEmbeddingDatabase:
 
         id_value = hashlib.sha256(text.encode()).hexdigest()
 
-        if self.data["ID"].isin([id_value]).any():
+        if self._contains(id_value):
             logger.error(
                 "Attempted to insert an entry with an existing id.",
                 extra={"id": id_value},
@@ -82,9 +190,30 @@ class AsyncEmbeddingDatabase:
             )
             raise ValueError("Embeddings must have 768 dimensions")
 
-        self.data = self.data._append(
-            {"ID": id_value, "Text": text, "Embeddings": embeddings}, ignore_index=True
-        )
+        self._append(id_value, text, embeddings)
 
         await self._save()
         logger.debug("New entry inserted into the database.", extra={"id": id_value})
+
+    def _contains(self, id_value: str) -> bool:
+        """Checks whether an entry with the given id is stored.
+
+        Args:
+            id_value: The entry id to look up.
+
+        Returns:
+            True if the id is already in the database.
+        """
+        return bool(self.data["ID"].isin([id_value]).any())
+
+    def _append(self, id_value: str, text: str, embeddings: list[float] | np.ndarray[Any, np.dtype[np.float32]]) -> None:
+        """Appends a validated entry to the in-memory data.
+
+        Args:
+            id_value: The entry id.
+            text: The input text corresponding to the embeddings.
+            embeddings: The embeddings, as a list or float32 array, to be stored.
+        """
+        self.data = self.data._append(
+            {"ID": id_value, "Text": text, "Embeddings": embeddings}, ignore_index=True
+        )
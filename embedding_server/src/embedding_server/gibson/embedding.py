@@ -35,6 +35,20 @@ class AsyncEmbeddingService:
         Returns:
             A list representing the sentence embedding.
 
+        Raises:
+            FlakyNetworkException: If a simulated network error occurs.
+        """
+        return (await self.embed_batch([text]))[0]
+
+    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Generates embeddings for several texts in a single request.
+
+        Args:
+            texts: The input texts to generate embeddings for.
+
+        Returns:
+            A list of sentence embeddings, in the same order as the texts.
+
         Raises:
             FlakyNetworkException: If a simulated network error occurs.
         """
@@ -42,7 +56,7 @@ class AsyncEmbeddingService:
             logger.error("Flaky network error occurred during embedding.")
             raise FlakyNetworkException("Network error occurred")
 
-        logger.debug("Generating embeddings.", extra={"text": text})
+        logger.debug("Generating embeddings.", extra={"count": len(texts)})
 
         url = "https://router.huggingface.co/hf-inference/models/sentence-transformers/all-mpnet-base-v2/pipeline/feature-extraction"
 
@@ -52,29 +66,31 @@ class AsyncEmbeddingService:
 
         async with AsyncClient() as client:
             response = await client.post(
-                url=url, headers=headers, json={"inputs": [text]}
+                url=url, headers=headers, json={"inputs": texts}
             )
 
-        # HuggingFace may need to initialize
-        if response.status_code == HTTPStatus.SERVICE_UNAVAILABLE:
-            logger.warning(
-                "HuggingFace Embedding API is initializing, waiting for it to be ready."
-            )
-            await asyncio.sleep(response.json()["estimated_time"] + 1)
-            response = await client.post(
-                url=url, headers=headers, json={"inputs": [text]}
-            )
+            # HuggingFace may need to initialize
+            if response.status_code == HTTPStatus.SERVICE_UNAVAILABLE:
+                logger.warning(
+                    "HuggingFace Embedding API is initializing, waiting for it to be ready."
+                )
+                await asyncio.sleep(response.json()["estimated_time"] + 1)
+                response = await client.post(
+                    url=url, headers=headers, json={"inputs": texts}
+                )
 
         if response.status_code != HTTPStatus.OK:
             raise Exception(f"Request failed with status code {response.status_code}")
 
-        data = response.json()[0]
+        data = response.json()
 
-        if not isinstance(data, list) or not all(
-            isinstance(item, float) for item in data
+        if not isinstance(data, list) or len(data) != len(texts) or not all(
+            isinstance(embedding, list)
+            and all(isinstance(item, float) for item in embedding)
+            for embedding in data
         ):
             raise ValueError(
-                "Expected a list of floats, but received a different type."
+                "Expected a list of floats per input, but received a different type."
             )
 
         return data
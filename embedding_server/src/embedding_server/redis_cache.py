@@ -1,45 +1,74 @@
 """Redis cache implementation for vector search results."""
-import json
-import hashlib
+import asyncio
 from typing import List, Tuple, Optional
+import orjson
 import redis.asyncio as redis
+import xxhash
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Size of the shared connection pool, opened in full when connecting
+REDIS_MAX_CONNECTIONS = 16
+
+# Seconds a command waits for a free pooled connection before failing
+REDIS_POOL_TIMEOUT = 5.0
+
 
 class RedisCache:
     """Redis cache for vector search results."""
     
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379",
+        max_connections: int = REDIS_MAX_CONNECTIONS
+    ):
         """Initialize Redis cache.
         
         Args:
             redis_url: Redis connection URL.
+            max_connections: Size of the connection pool. Commands beyond
+                it wait for a free connection.
         """
         self.redis_url = redis_url
+        self.max_connections = max_connections
         self.redis_client: Optional[redis.Redis] = None
+        self._pool: Optional[redis.BlockingConnectionPool] = None
         self.ttl = 3600  # 1 hour cache TTL
     
     async def connect(self):
-        """Connect to Redis."""
+        """Connect to Redis and open every connection in the pool.
+        
+        Connections are otherwise opened lazily, which would add a TCP
+        handshake to the first requests after startup.
+        """
         try:
-            self.redis_client = await redis.from_url(
+            # Values are orjson bytes, so responses are left undecoded
+            # A blocking pool makes commands past max_connections wait for
+            # a free connection instead of failing with "Too many connections"
+            self._pool = redis.BlockingConnectionPool.from_url(
                 self.redis_url,
-                encoding="utf-8",
-                decode_responses=True
+                max_connections=self.max_connections,
+                timeout=REDIS_POOL_TIMEOUT,
+            )
+            self.redis_client = redis.Redis(connection_pool=self._pool)
+            await asyncio.gather(
+                *(self.redis_client.ping() for _ in range(self.max_connections))
             )
-            await self.redis_client.ping()
-            logger.info("Connected to Redis cache")
+            logger.info(f"Connected to Redis cache with {self.max_connections} connections")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
+            await self.disconnect()
             self.redis_client = None
     
     async def disconnect(self):
         """Disconnect from Redis."""
         if self.redis_client:
             await self.redis_client.close()
+        if self._pool:
+            await self._pool.disconnect()
+            self._pool = None
     
     def _generate_cache_key(self, query: str, top_k: int) -> str:
         """Generate cache key from query and parameters.
@@ -52,7 +81,8 @@ class RedisCache:
             Cache key string.
         """
         content = f"{query}:{top_k}"
-        return f"vector_search:{hashlib.md5(content.encode()).hexdigest()}"
+        # Non-cryptographic hash; keys only need to be well distributed
+        return f"vector_search:{xxhash.xxh3_64_hexdigest(content)}"
     
     async def get(
         self, 
@@ -65,6 +95,20 @@ class RedisCache:
             query: Search query text.
             top_k: Number of results.
             
+        Returns:
+            Cached results if available, None otherwise.
+        """
+        return await self.get_by_key(self._generate_cache_key(query, top_k))
+    
+    async def get_by_key(
+        self, 
+        key: str
+    ) -> Optional[List[Tuple[str, float, str]]]:
+        """Get cached search results stored under a precomputed key.
+        
+        Args:
+            key: Cache key from _generate_cache_key.
+            
         Returns:
             Cached results if available, None otherwise.
         """
@@ -72,14 +116,13 @@ class RedisCache:
             return None
         
         try:
-            key = self._generate_cache_key(query, top_k)
             cached = await self.redis_client.get(key)
             
             if cached:
-                logger.info(f"Cache hit for query: {query[:20]}...")
-                return json.loads(cached)
+                logger.info(f"Cache hit for key: {key}")
+                return orjson.loads(cached)
             
-            logger.info(f"Cache miss for query: {query[:20]}...")
+            logger.info(f"Cache miss for key: {key}")
             return None
             
         except Exception as e:
@@ -99,23 +142,92 @@ class RedisCache:
             top_k: Number of results.
             results: Search results to cache.
         """
+        await self.set_by_key(self._generate_cache_key(query, top_k), results)
+    
+    async def set_by_key(
+        self, 
+        key: str, 
+        results: List[Tuple[str, float, str]]
+    ) -> None:
+        """Cache search results under a precomputed key.
+        
+        Args:
+            key: Cache key from _generate_cache_key.
+            results: Search results to cache.
+        """
         if not self.redis_client:
             return
         
         try:
-            key = self._generate_cache_key(query, top_k)
             await self.redis_client.setex(
                 key,
                 self.ttl,
-                json.dumps(results)
+                orjson.dumps(results)
             )
-            logger.info(f"Cached results for query: {query[:20]}...")
+            logger.info(f"Cached results for key: {key}")
             
         except Exception as e:
             logger.error(f"Redis set error: {e}")
     
+    async def mget(
+        self, 
+        items: List[Tuple[str, int]]
+    ) -> List[Optional[List[Tuple[str, float, str]]]]:
+        """Get cached search results for several queries in one round-trip.
+        
+        Args:
+            items: (query, top_k) pairs to look up.
+            
+        Returns:
+            Cached results for each pair, or None where there is no entry.
+        """
+        if not self.redis_client or not items:
+            return [None] * len(items)
+        
+        try:
+            keys = [self._generate_cache_key(query, top_k) for query, top_k in items]
+            cached = await self.redis_client.mget(keys)
+            
+            hits = sum(value is not None for value in cached)
+            logger.info(f"Cache hits for {hits}/{len(items)} queries")
+            return [orjson.loads(value) if value else None for value in cached]
+            
+        except Exception as e:
+            logger.error(f"Redis mget error: {e}")
+            return [None] * len(items)
+    
+    async def mset(
+        self, 
+        items: List[Tuple[str, int, List[Tuple[str, float, str]]]]
+    ) -> None:
+        """Cache search results for several queries in one pipelined round-trip.
+        
+        Args:
+            items: (query, top_k, results) triples to cache.
+        """
+        if not self.redis_client or not items:
+            return
+        
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for query, top_k, results in items:
+                    pipe.setex(
+                        self._generate_cache_key(query, top_k),
+                        self.ttl,
+                        orjson.dumps(results)
+                    )
+                await pipe.execute()
+            logger.info(f"Cached results for {len(items)} queries")
+            
+        except Exception as e:
+            logger.error(f"Redis mset error: {e}")
+    
     async def clear(self):
-        """Clear all cached results."""
+        """Clear all cached results.
+        
+        Keys are removed with UNLINK, which frees memory in the background,
+        and the deletes are sent in one pipeline after the scan completes.
+        """
         if not self.redis_client:
             return
         
@@ -123,18 +235,21 @@ class RedisCache:
             pattern = "vector_search:*"
             cursor = 0
             
-            while True:
-                cursor, keys = await self.redis_client.scan(
-                    cursor, 
-                    match=pattern, 
-                    count=100
-                )
-                
-                if keys:
-                    await self.redis_client.delete(*keys)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                while True:
+                    cursor, keys = await self.redis_client.scan(
+                        cursor, 
+                        match=pattern, 
+                        count=1000
+                    )
+                    
+                    if keys:
+                        pipe.unlink(*keys)
+                    
+                    if cursor == 0:
+                        break
                 
-                if cursor == 0:
-                    break
+                await pipe.execute()
                     
             logger.info("Cleared all cached search results")
             
@@ -8,9 +8,10 @@ from typing import List, Optional
 import uvicorn
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field
 
-from .vector_search import VectorSearchDatabase, CachedVectorSearchDatabase
+from .vector_search import EMBEDDING_CACHE_SIZE, VectorSearchDatabase, CachedVectorSearchDatabase
 from .redis_cache import RedisCache
 from .gibson.embedding import AsyncEmbeddingService
 from .gibson.exceptions import FlakyNetworkException
@@ -22,7 +23,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Vector Search API",
     description="Enterprise-grade semantic search with Redis caching",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware IMMEDIATELY after app creation
@@ -51,16 +53,25 @@ app.redoc_url = "/redoc"
 # Initialize database with Redis caching if available
 db_path = Path(__file__).parent.parent / "data" / "embeddings.json"
 redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+precision = os.getenv("EMBEDDING_PRECISION", "float32")
+use_ann = "ANN_INDEX" in os.environ
+use_gpu = bool(os.getenv("CUDA_VISIBLE_DEVICES"))
+embedding_cache_size = int(os.getenv("EMBEDDING_CACHE_SIZE", EMBEDDING_CACHE_SIZE))
 
 try:
-    db = CachedVectorSearchDatabase(db_path, redis_url)
+    db = CachedVectorSearchDatabase(
+        db_path, redis_url, precision, use_ann, embedding_cache_size, use_gpu
+    )
     logger.info("Using Redis-cached vector search database")
 except Exception as e:
     logger.warning(f"Redis unavailable, falling back to standard database: {e}")
-    db = VectorSearchDatabase(db_path)
+    db = VectorSearchDatabase(db_path, precision, use_ann, embedding_cache_size, use_gpu)
 
 es = AsyncEmbeddingService()
 
+# Most queries accepted in one batch search, bounding the embedding calls it fans out to
+MAX_BATCH_QUERIES = 64
+
 
 class InsertRequest(BaseModel):
     """Represents an insert request."""
@@ -75,6 +86,13 @@ class SearchRequest(BaseModel):
     use_cache: Optional[bool] = True
 
 
+class BatchSearchRequest(BaseModel):
+    """Represents a search request for several queries."""
+    queries: List[str] = Field(min_length=1, max_length=MAX_BATCH_QUERIES)
+    top_k: Optional[int] = 5
+    use_cache: bool = True
+
+
 class SearchResult(BaseModel):
     """Represents a single search result."""
     id: str
@@ -88,6 +106,11 @@ class SearchResponse(BaseModel):
     cache_hit: Optional[bool] = None
 
 
+class BatchSearchResponse(BaseModel):
+    """Represents the batch search response, one entry per query."""
+    results: List[SearchResponse]
+
+
 class CacheStats(BaseModel):
     """Cache statistics response."""
     status: str
@@ -175,18 +198,19 @@ async def insert_data(request: InsertRequest) -> dict[str, str]:
         ) from error
     finally:
         if request.test_db is not None:
-            Path.unlink(test_db_path, missing_ok=True)
+            for path in (test_db_path, *test_db.sidecar_paths):
+                Path.unlink(path, missing_ok=True)
 
 
 @app.post("/search", response_model=SearchResponse)
-async def search_embeddings(request: SearchRequest) -> SearchResponse:
+async def search_embeddings(request: SearchRequest) -> ORJSONResponse:
     """Search for similar embeddings based on the query text.
     
     Args:
         request: The search request containing query text and optional parameters.
         
     Returns:
-        SearchResponse containing list of similar results sorted by score.
+        JSON response in the SearchResponse shape, with results sorted by score.
         
     Raises:
         HTTPException: If search fails due to network or other errors.
@@ -198,14 +222,17 @@ async def search_embeddings(request: SearchRequest) -> SearchResponse:
     
     try:
         # Check if we have caching capability
+        cache_hit = None
         if hasattr(db, 'search'):
             if hasattr(db, 'cache'):
                 # Use cached search
-                results = await db.search(
+                results, hit = await db.search_with_cache_status(
                     query_text=request.query,
                     top_k=request.top_k or 5,
                     use_cache=request.use_cache
                 )
+                if request.use_cache:
+                    cache_hit = hit
             else:
                 # Standard search without cache
                 results = await db.search(
@@ -218,20 +245,16 @@ async def search_embeddings(request: SearchRequest) -> SearchResponse:
                 detail="Search functionality not available"
             )
         
+        # Results are already typed by the search, so they are serialized
+        # directly instead of being validated again through SearchResponse
         search_results = [
-            SearchResult(id=id_, score=score, text=text)
+            {"id": id_, "score": score, "text": text}
             for id_, score, text in results
         ]
         
         logger.info(f"Search completed, found {len(search_results)} results")
         
-        # Determine if this was a cache hit (simplified check)
-        cache_hit = None
-        if hasattr(db, 'cache') and request.use_cache:
-            # In a real implementation, we'd track this in the search method
-            cache_hit = len(results) > 0  # Simplified
-        
-        return SearchResponse(results=search_results, cache_hit=cache_hit)
+        return ORJSONResponse({"results": search_results, "cache_hit": cache_hit})
         
     except FlakyNetworkException as error:
         logger.error(
@@ -253,6 +276,78 @@ async def search_embeddings(request: SearchRequest) -> SearchResponse:
         ) from error
 
 
+@app.post("/search_batch", response_model=BatchSearchResponse)
+async def search_embeddings_batch(request: BatchSearchRequest) -> ORJSONResponse:
+    """Search for similar embeddings for several queries in one request.
+    
+    Args:
+        request: The batch search request containing query texts and optional parameters.
+        
+    Returns:
+        JSON response in the BatchSearchResponse shape, with one result list
+        per query in request order.
+        
+    Raises:
+        HTTPException: If search fails due to network or other errors.
+    """
+    logger.debug(
+        "Received batch search request",
+        extra={"queries": len(request.queries), "top_k": request.top_k, "use_cache": request.use_cache}
+    )
+    
+    try:
+        cache_hits: List[Optional[bool]] = [None] * len(request.queries)
+        if hasattr(db, 'cache'):
+            # Use cached search
+            batch_results, hits = await db.search_batch_with_cache_status(
+                query_texts=request.queries,
+                top_k=request.top_k or 5,
+                use_cache=request.use_cache
+            )
+            if request.use_cache:
+                cache_hits = list(hits)
+        else:
+            # Standard search without cache
+            batch_results = await db.search_batch(
+                query_texts=request.queries,
+                top_k=request.top_k or 5
+            )
+        
+        responses = [
+            {
+                "results": [
+                    {"id": id_, "score": score, "text": text}
+                    for id_, score, text in results
+                ],
+                "cache_hit": cache_hit
+            }
+            for results, cache_hit in zip(batch_results, cache_hits)
+        ]
+        
+        logger.info(f"Batch search completed for {len(responses)} queries")
+        
+        return ORJSONResponse({"results": responses})
+        
+    except FlakyNetworkException as error:
+        logger.error(
+            "Network error during batch search",
+            extra={"error": str(error)}
+        )
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail="Network error occurred during search, please try again"
+        ) from error
+    except Exception as error:
+        logger.error(
+            "Unexpected error during batch search",
+            extra={"error": str(error)}
+        )
+        raise HTTPException(
+            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred"
+        ) from error
+
+
 @app.get("/cache/stats", response_model=CacheStats)
 async def get_cache_stats() -> CacheStats:
     """Get Redis cache statistics.
@@ -1,29 +1,615 @@
 """Vector search implementation for embedding database."""
 import asyncio
+import contextlib
 import logging
-from typing import List, Tuple, Any
+from collections import OrderedDict
+from typing import List, Mapping, Optional, Tuple, Any, Union, cast
 import numpy as np
+import pandas as pd
 from pathlib import Path
 
+from embedding_server.embedding_batcher import EmbeddingBatcher
 from embedding_server.gibson.database import AsyncEmbeddingDatabase
 from embedding_server.gibson.embedding import AsyncEmbeddingService
 from embedding_server.gibson.exceptions import FlakyNetworkException
 from embedding_server.redis_cache import RedisCache  # Add this import
 
+try:
+    import hnswlib
+except ImportError:  # Optional "ann" extra
+    hnswlib = None
+
+try:
+    import simsimd
+except ImportError:  # Optional "simd" extra
+    simsimd = None  # type: ignore[assignment]
+
+try:
+    import cupy
+except ImportError:  # Optional "gpu" extra
+    cupy = None
+
 logger = logging.getLogger(__name__)
 
+# Storage dtypes for the document matrix. int8 rows are quantized
+# symmetrically with one scale per row. Without SimSIMD, scoring upcasts the
+# rows and runs in float32; with it, float16 rows are scored against float16
+# queries and int8 rows against queries quantized the same way.
+STORAGE_DTYPES: dict[str, type[np.number[Any]]] = {
+    "float32": np.float32,
+    "float16": np.float16,
+    "int8": np.int8,
+}
+
+# Default number of query embeddings kept in the in-process LRU cache
+EMBEDDING_CACHE_SIZE = 10_000
+
+# Seconds to wait before each embedding retry, and the longest wait allowed
+_RETRY_DELAYS = (1, 2, 4, 8, 16, 32)
+MAX_RETRY_DELAY = 30.0
+
+# HNSW graph parameters: build-time neighbour count and candidate list size,
+# and the minimum candidate list size searched per query
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Documents scored per block in exact search, bounding the score buffer to
+# this many columns per query however large the matrix is
+SCORE_CHUNK_ROWS = 65_536
+
+# Rows of a float16 or int8 matrix upcast to float32 at a time when SimSIMD is
+# not installed, so the float32 temporary stays cache-sized
+UPCAST_BLOCK_ROWS = 1_024
+
 
 class VectorSearchDatabase(AsyncEmbeddingDatabase):
     """Extended database with vector similarity search capabilities."""
     
-    def __init__(self, cache_path: Path):
+    def __init__(
+        self,
+        cache_path: Path,
+        precision: str = "float32",
+        use_ann: bool = False,
+        embedding_cache_size: int = EMBEDDING_CACHE_SIZE,
+        use_gpu: bool = False
+    ):
         """Initialize the vector search database.
         
         Args:
             cache_path: Path to the cache file where the database is stored.
+            precision: Storage dtype of the in-memory document matrix. "float16"
+                halves its memory footprint and "int8" quarters it, at a small
+                cost in score precision.
+            use_ann: Answer queries from an approximate HNSW index instead of
+                exact brute-force scoring. Requires the "ann" extra; exact
+                search is used when hnswlib is not installed.
+            embedding_cache_size: Number of query embeddings kept in the LRU
+                cache; 0 disables it.
+            use_gpu: Score exact searches on a CUDA device, with the matrix
+                mirrored to device memory during setup. Requires the "gpu"
+                extra; scoring stays on the CPU when CuPy is not installed or
+                no device is visible.
+                
+        Raises:
+            ValueError: If the precision is not supported.
         """
+        if precision not in STORAGE_DTYPES:
+            raise ValueError(
+                f"Unsupported precision {precision!r}, expected one of {sorted(STORAGE_DTYPES)}"
+            )
+        
         super().__init__(cache_path)
-        self.embedding_service = AsyncEmbeddingService()
+        self._batcher = EmbeddingBatcher(AsyncEmbeddingService())
+        self.precision = precision
+        self._doc_matrix: np.ndarray[Any, np.dtype[np.number[Any]]] = np.empty((0, 0), dtype=np.float32)
+        # Per-row factors mapping stored rows back to unit vectors (1 unless int8)
+        self._scales: np.ndarray[Any, np.dtype[np.float32]] = np.empty(0, dtype=np.float32)
+        self._ids: np.ndarray[Any, np.dtype[np.object_]] = np.empty(0, dtype=object)
+        self._texts: np.ndarray[Any, np.dtype[np.object_]] = np.empty(0, dtype=object)
+        # Raw embeddings backing the JSON file, kept in float64 so saving
+        # writes back the values read; None until the JSON is parsed
+        self._embeddings: Optional[np.ndarray[Any, np.dtype[np.float64]]] = None
+        # Full-capacity arrays behind the views above, grown by doubling on insert
+        self._buffers: Optional[Tuple[np.ndarray[Any, Any], ...]] = None
+        self.embedding_cache_size = embedding_cache_size
+        self._embedding_cache: OrderedDict[str, np.ndarray[Any, np.dtype[np.float32]]] = OrderedDict()
+        self._ann_index: Any = None
+        self._load_lock = asyncio.Lock()
+        # Float32 copy of the search matrix on the GPU, grown by doubling like
+        # the host buffers; None until mirrored during setup
+        self._gpu_buffer: Any = None
+        self._gpu_rows = 0
+        
+        if use_ann and hnswlib is None:
+            logger.warning("hnswlib is not installed, falling back to exact search")
+        self.use_ann = use_ann and hnswlib is not None
+        # Only query the device count when asked to, as it initializes CUDA
+        self.use_gpu = use_gpu and self._cuda_device_count() > 0
+        if use_gpu and not self.use_gpu:
+            logger.warning("cupy is not installed or sees no CUDA device, scoring on the CPU")
+    
+    @classmethod
+    def from_arrays(
+        cls,
+        cache_path: Path,
+        ids: Any,
+        texts: Any,
+        embeddings: Any,
+        **kwargs: Any
+    ) -> "VectorSearchDatabase":
+        """Create a database holding the given entries, without a DataFrame.
+        
+        The entries are only in memory until the database is saved.
+        
+        Args:
+            cache_path: Path to the cache file where the database is stored.
+            ids: Entry IDs.
+            texts: Entry texts, one per ID.
+            embeddings: Embedding matrix or sequence of vectors, one per ID.
+            **kwargs: Further constructor arguments such as precision.
+            
+        Returns:
+            The populated database.
+        """
+        db = cls(cache_path, **kwargs)
+        db._load_arrays(ids, texts, embeddings)
+        return db
+    
+    @property
+    def embedding_service(self) -> AsyncEmbeddingService:
+        """Embedding service used by the request batcher."""
+        return self._batcher.embedding_service
+    
+    @embedding_service.setter
+    def embedding_service(self, service: AsyncEmbeddingService) -> None:
+        self._batcher.embedding_service = service
+    
+    @property
+    def data(self) -> pd.DataFrame:
+        """Database entries as a DataFrame, built on demand from the arrays.
+        
+        Raises:
+            AttributeError: If the JSON database has not been loaded.
+        """
+        if self._embeddings is None:
+            raise AttributeError("data has not been loaded from the JSON database")
+        return pd.DataFrame({
+            "ID": self._ids,
+            "Text": self._texts,
+            "Embeddings": list(self._embeddings),
+        })
+    
+    @data.setter
+    def data(self, columns: Union[pd.DataFrame, Mapping[str, Any]]) -> None:
+        """Replace all entries, converting them to contiguous arrays.
+        
+        Args:
+            columns: DataFrame or mapping with "ID", "Text" and "Embeddings"
+                columns.
+        """
+        embeddings = columns["Embeddings"]
+        if isinstance(embeddings, pd.Series):
+            embeddings = embeddings.tolist()
+        self._load_arrays(columns["ID"], columns["Text"], embeddings)
+    
+    @staticmethod
+    async def _read_json(path: Path) -> dict[str, list[Any]]:
+        """Read the JSON database as plain columns, without building a DataFrame.
+        
+        Args:
+            path: The path to the JSON file to read.
+            
+        Returns:
+            Mapping of column name to its values.
+        """
+        logger.debug(f"Reading JSON file from {path}.")
+        return await asyncio.to_thread(AsyncEmbeddingDatabase._parse_columns, path)
+    
+    def _load_arrays(self, ids: Any, texts: Any, embeddings: Any) -> None:
+        """Replace all entries with the given columns.
+        
+        Args:
+            ids: Entry IDs.
+            texts: Entry texts, one per ID.
+            embeddings: Embedding matrix or sequence of vectors, one per ID.
+        """
+        ids = np.array(ids, dtype=object)
+        texts = np.array(texts, dtype=object)
+        if len(ids) == 0:
+            embeddings = np.empty((0, 0), dtype=np.float64)
+        else:
+            embeddings = np.array(embeddings, dtype=np.float64, ndmin=2)
+        
+        doc_matrix, scales = self._to_storage(self._normalize_rows(embeddings.astype(np.float32)))
+        self._gpu_buffer = None
+        self._set_size((ids, texts, embeddings, doc_matrix, scales), len(ids))
+    
+    async def setup(self) -> None:
+        """Initialize the database and build the search matrix.
+        
+        When the binary sidecar files are at least as new as the JSON
+        database, the matrix is memory-mapped from them and the JSON is not
+        parsed at all. Otherwise the JSON is loaded and only the sidecars are
+        rebuilt; the JSON itself is left as it is. Worker processes serving
+        the same database thus share one copy of the matrix through the page
+        cache.
+        """
+        if self._sidecars_are_fresh():
+            logger.info(f"Loading search matrix from {self.matrix_path}")
+            ids, texts, doc_matrix, scales = await asyncio.to_thread(self._read_sidecars)
+            self._set_index(ids, texts, doc_matrix, scales)
+        elif self.cache_path.exists():
+            logger.info(f"Rebuilding search matrix sidecars from {self.cache_path}")
+            self.data = await self._read_json(self.cache_path)
+            async with self._save_lock:
+                await asyncio.to_thread(
+                    self._write_sidecars, self._ids, self._texts, self._doc_matrix, self._scales
+                )
+        else:
+            await super().setup()
+        
+        if self.use_gpu:
+            await self._mirror_to_gpu()
+        
+        if self.use_ann:
+            self._ann_index = await asyncio.to_thread(self._load_ann_index)
+            self._sync_ann_index()
+            if self._ann_index is not None:
+                await asyncio.to_thread(self._ann_index.save_index, str(self.ann_index_path))
+    
+    async def insert(self, text: str, embeddings: Union[list[float], np.ndarray[Any, np.dtype[np.float32]]]) -> None:
+        """Insert a new entry and refresh the search matrix.
+        
+        Args:
+            text: The input text corresponding to the embeddings.
+            embeddings: The embeddings, as a list or float32 array, to be stored.
+        """
+        if self._embeddings is None:
+            # Setup was served from the sidecars; load the JSON on first write.
+            # Concurrent inserts wait for that load instead of repeating it,
+            # which would drop the rows appended in the meantime.
+            async with self._load_lock:
+                if self._embeddings is None:
+                    self.data = await self._read_json(self.cache_path)
+                    if self.use_gpu:
+                        await self._mirror_to_gpu()
+        
+        await super().insert(text, embeddings)
+    
+    async def _save(self) -> None:
+        """Save the JSON database and the sidecars as one snapshot.
+        
+        The snapshot is taken while holding the save lock and the sidecars
+        are written right after the JSON. Sidecars newer than the JSON thus
+        always hold the same rows.
+        """
+        logger.info(f"Saving database to JSON at {self.cache_path=}.")
+        async with self._save_lock:
+            if self._ann_index is not None:
+                self._sync_ann_index()
+            columns = self._json_columns()
+            await asyncio.to_thread(self._write_json, columns)
+            await asyncio.to_thread(
+                self._write_sidecars, self._ids, self._texts, self._doc_matrix, self._scales
+            )
+        logger.debug("Database saved.")
+    
+    def _json_columns(self) -> dict[str, Any]:
+        """Return the columns to save, with embeddings as the raw float64 matrix.
+        
+        orjson serializes the matrix directly, without going through a Python
+        list per row, and writes each value back as it was read.
+        
+        Returns:
+            Mapping of column name to its values.
+        """
+        return {
+            "ID": self._ids.tolist(),
+            "Text": self._texts.tolist(),
+            "Embeddings": self._embeddings,
+        }
+    
+    def _contains(self, id_value: str) -> bool:
+        """Check whether an entry with the given id is stored.
+        
+        Args:
+            id_value: The entry id to look up.
+            
+        Returns:
+            True if the id is already in the database.
+        """
+        return bool((self._ids == id_value).any())
+    
+    def _append(self, id_value: str, text: str, embeddings: Union[list[float], np.ndarray[Any, np.dtype[np.float32]]]) -> None:
+        """Append an entry to the arrays, doubling their capacity when full.
+        
+        Args:
+            id_value: The entry id.
+            text: The input text corresponding to the embeddings.
+            embeddings: The embeddings, as a list or float32 array, to be stored.
+        """
+        n = len(self._ids)
+        buffers = self._buffers
+        if buffers is None or n == len(buffers[0]):
+            buffers = self._grow(max(2 * n, 16), len(embeddings))
+        
+        ids, texts, raw, doc_matrix, scales = buffers
+        ids[n] = id_value
+        texts[n] = text
+        raw[n] = embeddings
+        doc_matrix[n:n + 1], scales[n:n + 1] = self._to_storage(
+            self._normalize_rows(raw[n:n + 1].astype(np.float32))
+        )
+        self._set_size(buffers, n + 1)
+        self._sync_gpu_matrix()
+    
+    def _grow(self, capacity: int, dim: int) -> Tuple[np.ndarray[Any, Any], ...]:
+        """Move the entries into larger buffers.
+        
+        Args:
+            capacity: Number of rows in the new buffers.
+            dim: Embedding dimension, used when the database is still empty.
+            
+        Returns:
+            The new buffers, holding the current entries in their first rows.
+        """
+        n = len(self._ids)
+        buffers = (
+            np.empty(capacity, dtype=object),
+            np.empty(capacity, dtype=object),
+            np.empty((capacity, dim), dtype=np.float64),
+            np.empty((capacity, dim), dtype=STORAGE_DTYPES[self.precision]),
+            np.empty(capacity, dtype=np.float32),
+        )
+        if n:
+            current = (self._ids, self._texts, self._embeddings, self._doc_matrix, self._scales)
+            for buffer, rows in zip(buffers, current):
+                buffer[:n] = rows
+        return buffers
+    
+    def _set_size(self, buffers: Tuple[np.ndarray[Any, Any], ...], n: int) -> None:
+        """Keep the buffers and point the search arrays at their first n rows.
+        
+        Args:
+            buffers: The ids, texts, embeddings, matrix and scales buffers.
+            n: Number of stored entries.
+        """
+        self._buffers = buffers
+        ids, texts, embeddings, doc_matrix, scales = buffers
+        self._ids = ids[:n]
+        self._texts = texts[:n]
+        self._embeddings = embeddings[:n]
+        self._doc_matrix = doc_matrix[:n]
+        self._scales = scales[:n]
+    
+    @property
+    def matrix_path(self) -> Path:
+        """Path of the memory-mappable search matrix in the configured precision."""
+        if self.precision == "float32":
+            return self.cache_path.with_suffix(".npy")
+        return self.cache_path.with_suffix(f".{self.precision}.npy")
+    
+    @property
+    def scales_path(self) -> Path:
+        """Path of the per-row scales of an int8 search matrix."""
+        return self.cache_path.with_suffix(".scales.npy")
+    
+    @property
+    def metadata_path(self) -> Path:
+        """Path of the ID and text columns matching the matrix rows."""
+        return self.cache_path.with_suffix(".parquet")
+    
+    @property
+    def sidecar_paths(self) -> tuple[Path, ...]:
+        """Paths of all sidecar files used by the configured precision."""
+        if self.precision == "int8":
+            return (self.matrix_path, self.scales_path, self.metadata_path)
+        return (self.matrix_path, self.metadata_path)
+    
+    @property
+    def ann_index_path(self) -> Path:
+        """Path of the persisted HNSW index."""
+        return self.cache_path.with_suffix(".hnsw")
+    
+    def _sidecars_are_fresh(self) -> bool:
+        """Check whether the sidecar files reflect the current JSON database.
+        
+        Returns:
+            True if all sidecars exist and are no older than the JSON file.
+        """
+        paths = (self.cache_path, *self.sidecar_paths)
+        if not all(path.exists() for path in paths):
+            return False
+        
+        json_mtime = self.cache_path.stat().st_mtime
+        return all(path.stat().st_mtime >= json_mtime for path in paths[1:])
+    
+    def _read_sidecars(self) -> tuple[
+        np.ndarray[Any, np.dtype[np.object_]],
+        np.ndarray[Any, np.dtype[np.object_]],
+        np.ndarray[Any, np.dtype[np.number[Any]]],
+        np.ndarray[Any, np.dtype[np.float32]],
+    ]:
+        """Read IDs, texts, the memory-mapped search matrix and its scales from disk."""
+        metadata = pd.read_parquet(self.metadata_path, columns=["ID", "Text"])
+        doc_matrix = np.load(self.matrix_path, mmap_mode="r")
+        if self.precision == "int8":
+            scales = np.load(self.scales_path)
+        else:
+            scales = np.ones(len(doc_matrix), dtype=np.float32)
+        return metadata["ID"].to_numpy(), metadata["Text"].to_numpy(), doc_matrix, scales
+    
+    def _write_sidecars(
+        self,
+        ids: np.ndarray[Any, np.dtype[np.object_]],
+        texts: np.ndarray[Any, np.dtype[np.object_]],
+        doc_matrix: np.ndarray[Any, np.dtype[np.number[Any]]],
+        scales: np.ndarray[Any, np.dtype[np.float32]]
+    ) -> None:
+        """Atomically replace each sidecar file so readers never see partial data.
+        
+        The matrix is stored exactly as searched, L2-normalized and in the
+        configured precision, so it can be memory-mapped without conversion.
+        
+        Args:
+            ids: Entry IDs, one per matrix row.
+            texts: Entry texts, one per matrix row.
+            doc_matrix: Stored search matrix.
+            scales: Per-row scales of the stored matrix.
+        """
+        self._replace_file(self.matrix_path, lambda file: np.save(file, doc_matrix))
+        if self.precision == "int8":
+            self._replace_file(self.scales_path, lambda file: np.save(file, scales))
+        metadata = pd.DataFrame({"ID": ids, "Text": texts})
+        self._replace_file(self.metadata_path, lambda file: metadata.to_parquet(file, index=False))
+    
+    def _set_index(
+        self,
+        ids: np.ndarray[Any, np.dtype[np.object_]],
+        texts: np.ndarray[Any, np.dtype[np.object_]],
+        doc_matrix: np.ndarray[Any, np.dtype[np.number[Any]]],
+        scales: np.ndarray[Any, np.dtype[np.float32]]
+    ) -> None:
+        """Install a search matrix read from the sidecars.
+        
+        The matrix is already in the configured precision, so one
+        memory-mapped from the sidecar is searched in place without being
+        copied into memory. The raw embeddings stay unloaded until the next
+        insert needs them.
+        
+        Args:
+            ids: Entry IDs, one per matrix row.
+            texts: Entry texts, one per matrix row.
+            doc_matrix: Stored search matrix.
+            scales: Per-row scales of the stored matrix.
+        """
+        self._doc_matrix = doc_matrix
+        self._scales = scales
+        self._gpu_buffer = None
+        self._ids = ids
+        self._texts = texts
+        self._embeddings = None
+        self._buffers = None
+    
+    @staticmethod
+    def _normalize_rows(
+        embeddings: np.ndarray[Any, np.dtype[np.float32]]
+    ) -> np.ndarray[Any, np.dtype[np.float32]]:
+        """L2-normalize each row so cosine similarity becomes a dot product.
+        
+        Zero vectors are left as zeros and so score 0 against every query.
+        
+        Args:
+            embeddings: Raw float32 embedding matrix.
+            
+        Returns:
+            Row-normalized float32 matrix.
+        """
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.asarray(embeddings / norms, dtype=np.float32)
+    
+    def _to_storage(
+        self,
+        doc_matrix: np.ndarray[Any, np.dtype[np.float32]]
+    ) -> tuple[np.ndarray[Any, np.dtype[np.number[Any]]], np.ndarray[Any, np.dtype[np.float32]]]:
+        """Convert normalized rows to the configured storage precision.
+        
+        Float precisions are a plain cast. For int8 each row is scaled so its
+        largest component maps to 127, and the inverse scale is returned.
+        
+        Args:
+            doc_matrix: L2-normalized float32 rows.
+            
+        Returns:
+            Tuple of the stored rows and their per-row scales.
+        """
+        if self.precision != "int8":
+            scales = np.ones(len(doc_matrix), dtype=np.float32)
+            return doc_matrix.astype(STORAGE_DTYPES[self.precision], copy=False), scales
+        
+        scales = np.max(np.abs(doc_matrix), axis=1, initial=0.0).astype(np.float32) / 127
+        scales[scales == 0] = 1.0
+        return np.round(doc_matrix / scales[:, np.newaxis]).astype(np.int8), scales
+    
+    def _dequantize(self, rows: Any) -> np.ndarray[Any, np.dtype[np.float32]]:
+        """Read stored rows back as approximately unit float32 vectors.
+        
+        Args:
+            rows: Row index, slice or list of indices.
+            
+        Returns:
+            Float32 copy of the selected rows.
+        """
+        dequantized = np.array(self._doc_matrix[rows], dtype=np.float32)
+        dequantized *= self._scales[rows, np.newaxis]
+        return dequantized
+    
+    def _load_ann_index(self) -> Any:
+        """Load the persisted HNSW index if it matches the current matrix.
+        
+        Returns:
+            The loaded index, or None if it is missing or out of date.
+        """
+        n, dim = self._doc_matrix.shape
+        if n == 0 or not self.ann_index_path.exists():
+            return None
+        
+        index = hnswlib.Index(space="cosine", dim=dim)
+        try:
+            index.load_index(str(self.ann_index_path))
+        except RuntimeError as e:
+            logger.warning(f"Ignoring unreadable HNSW index: {e}")
+            return None
+        
+        return index if self._ann_index_matches(index) else None
+    
+    def _ann_index_matches(self, index: Any) -> bool:
+        """Check that an HNSW index holds a prefix of the current matrix rows.
+        
+        Rows are only ever appended, so comparing the first and last indexed
+        rows is enough to detect an index built from a different database.
+        
+        Args:
+            index: HNSW index to check.
+            
+        Returns:
+            True if the index can be extended with the remaining rows.
+        """
+        count = index.get_current_count()
+        if index.dim != self._doc_matrix.shape[1] or count > len(self._ids):
+            return False
+        if count == 0:
+            return True
+        
+        rows = [0, count - 1]
+        stored = np.asarray(index.get_items(rows), dtype=np.float32)
+        return bool(np.allclose(stored, self._dequantize(rows), atol=1e-3))
+    
+    def _sync_ann_index(self) -> None:
+        """Bring the HNSW index up to date with the search matrix.
+        
+        Existing indexes are extended with any rows added since they were
+        built; a new index is built when there is none or it does not match.
+        """
+        n, dim = self._doc_matrix.shape
+        if n == 0:
+            self._ann_index = None
+            return
+        
+        index = self._ann_index
+        if index is None or not self._ann_index_matches(index):
+            logger.info(f"Building HNSW index over {n} documents")
+            index = hnswlib.Index(space="cosine", dim=dim)
+            index.init_index(max_elements=n, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        
+        count = index.get_current_count()
+        if count < n:
+            if index.get_max_elements() < n:
+                index.resize_index(max(n, 2 * index.get_max_elements()))
+            index.add_items(self._dequantize(slice(count, n)), np.arange(count, n))
+        self._ann_index = index
     
     async def search(
         self, 
@@ -48,51 +634,347 @@ class VectorSearchDatabase(AsyncEmbeddingDatabase):
         query_embedding = await self._get_embedding_with_retry(
             query_text, max_retries
         )
+        return self._search_embeddings([query_embedding], top_k)[0]
+    
+    async def search_batch(
+        self, 
+        query_texts: List[str], 
+        top_k: int = 5,
+        max_retries: int = 3
+    ) -> List[List[Tuple[str, float, str]]]:
+        """Search for several queries at once.
+        
+        The queries are embedded concurrently, so the request batcher sends
+        them together, and all of them are scored with one matrix product.
+        
+        Args:
+            query_texts: Texts to search for.
+            top_k: Number of results to return per query.
+            max_retries: Maximum number of retries for network errors.
+            
+        Returns:
+            One result list per query, in the order of query_texts.
+            
+        Raises:
+            FlakyNetworkException: If network errors persist after retries.
+        """
+        query_embeddings = await asyncio.gather(*(
+            self._get_embedding_with_retry(text, max_retries) for text in query_texts
+        ))
+        return self._search_embeddings(query_embeddings, top_k)
+    
+    def _search_embeddings(
+        self,
+        query_embeddings: List[np.ndarray[Any, np.dtype[np.float32]]],
+        top_k: int
+    ) -> List[List[Tuple[str, float, str]]]:
+        """Rank the stored documents against each query embedding.
+        
+        Args:
+            query_embeddings: Embeddings of the query texts.
+            top_k: Number of results to return per query.
+            
+        Returns:
+            One list of (id, similarity_score, text) tuples per query, sorted by similarity.
+        """
+        if top_k <= 0 or len(self._ids) == 0 or not query_embeddings:
+            return [[] for _ in query_embeddings]
+        
+        queries = self._normalize_rows(np.stack(query_embeddings))
+        top_idx, top_scores = self._rank(queries, top_k)
+        
+        return [
+            [
+                (self._ids[i], float(score), self._texts[i])
+                for i, score in zip(row_idx, row_scores)
+            ]
+            for row_idx, row_scores in zip(top_idx, top_scores)
+        ]
+    
+    def _rank(
+        self,
+        queries: np.ndarray[Any, np.dtype[np.float32]],
+        top_k: int
+    ) -> tuple[np.ndarray[Any, np.dtype[np.intp]], np.ndarray[Any, np.dtype[np.float32]]]:
+        """Find the best matching documents for each normalized query.
+        
+        Args:
+            queries: L2-normalized float32 query vectors, one per row.
+            top_k: Number of documents to return per query.
+            
+        Returns:
+            Row indices and their cosine similarity per query, best first.
+        """
+        # Rows appended since the index was last synced, e.g. while an insert
+        # waits for the save lock, are only found by exact search
+        if self._ann_index is not None and self._ann_index.get_current_count() == len(self._ids):
+            k = min(top_k, len(self._ids))
+            self._ann_index.set_ef(max(HNSW_EF_SEARCH, k))
+            labels, distances = self._ann_index.knn_query(queries, k=k)
+            return labels.astype(np.intp), 1.0 - distances
+        
+        if self.use_gpu and self._gpu_buffer is not None:
+            return self._rank_gpu(queries, top_k)
+        
+        if len(self._ids) > SCORE_CHUNK_ROWS:
+            return self._rank_chunked(queries, top_k)
+        
+        # Score every document against every query with one matrix product
+        scores = self._score(queries)
+        top_idx = self._top_k_indices(scores, top_k)
+        return top_idx, np.take_along_axis(scores, top_idx, axis=1)
+    
+    def _rank_chunked(
+        self,
+        queries: np.ndarray[Any, np.dtype[np.float32]],
+        top_k: int
+    ) -> tuple[np.ndarray[Any, np.dtype[np.intp]], np.ndarray[Any, np.dtype[np.float32]]]:
+        """Find the best matching documents, scoring SCORE_CHUNK_ROWS at a time.
         
-        # Calculate similarities
-        results = []
-        for _, row in self.data.iterrows():
-            similarity = self._cosine_similarity(
-                np.array(query_embedding), 
-                np.array(row["Embeddings"])
+        Each block's top_k is merged into a running top_k, so no score array
+        wider than one block is allocated and a memory-mapped matrix is read
+        sequentially.
+        
+        Args:
+            queries: L2-normalized float32 query vectors, one per row.
+            top_k: Number of documents to return per query.
+            
+        Returns:
+            Row indices and their cosine similarity per query, best first.
+        """
+        top_idx = np.empty((len(queries), 0), dtype=np.intp)
+        top_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(self._ids), SCORE_CHUNK_ROWS):
+            scores = self._score(queries, slice(start, start + SCORE_CHUNK_ROWS))
+            chunk_idx = self._top_k_indices(scores, top_k)
+            candidates = np.concatenate([top_idx, chunk_idx + start], axis=1)
+            candidate_scores = np.concatenate(
+                [top_scores, np.take_along_axis(scores, chunk_idx, axis=1)], axis=1
+            )
+            best = self._top_k_indices(candidate_scores, top_k)
+            top_idx = np.take_along_axis(candidates, best, axis=1)
+            top_scores = np.take_along_axis(candidate_scores, best, axis=1)
+        return top_idx, top_scores
+    
+    @staticmethod
+    def _cuda_device_count() -> int:
+        """Number of CUDA devices visible to CuPy, 0 if none or CuPy is missing."""
+        if cupy is None:
+            return 0
+        try:
+            return int(cupy.cuda.runtime.getDeviceCount())
+        except Exception:  # No driver, or CUDA_VISIBLE_DEVICES hides every device
+            return 0
+    
+    def _to_device(
+        self,
+        doc_matrix: np.ndarray[Any, np.dtype[np.number[Any]]],
+        scales: np.ndarray[Any, np.dtype[np.float32]]
+    ) -> Any:
+        """Copy stored rows to the GPU as float32 unit vectors.
+        
+        Rows are transferred in their storage dtype and converted on the
+        device, so no float32 copy of the matrix is made on the host.
+        
+        Args:
+            doc_matrix: Stored rows.
+            scales: Per-row scales of the stored rows.
+            
+        Returns:
+            Float32 device array of the rows.
+        """
+        rows = cupy.asarray(doc_matrix)
+        if rows.dtype == np.float32:
+            return rows
+        rows = rows.astype(np.float32)
+        if self.precision == "int8":
+            rows *= cupy.asarray(scales)[:, np.newaxis]
+        return rows
+    
+    async def _mirror_to_gpu(self) -> None:
+        """Copy the whole search matrix to the GPU in a worker thread.
+        
+        Rows appended while the copy runs are added once it completes.
+        """
+        doc_matrix, scales = self._doc_matrix, self._scales
+        logger.info(f"Copying search matrix of {len(doc_matrix)} documents to the GPU")
+        self._gpu_buffer = await asyncio.to_thread(self._to_device, doc_matrix, scales)
+        self._gpu_rows = len(doc_matrix)
+        self._sync_gpu_matrix()
+    
+    def _sync_gpu_matrix(self) -> None:
+        """Copy rows appended since the last sync to the GPU mirror, if any.
+        
+        The device buffer doubles in capacity when full, so an insert only
+        transfers its own row.
+        """
+        if self._gpu_buffer is None:
+            return
+        
+        n, dim = self._doc_matrix.shape
+        capacity = len(self._gpu_buffer)
+        if n > capacity:
+            grown = cupy.empty((max(n, 2 * capacity), dim), dtype=np.float32)
+            grown[:self._gpu_rows] = self._gpu_buffer[:self._gpu_rows]
+            self._gpu_buffer = grown
+        if self._gpu_rows < n:
+            self._gpu_buffer[self._gpu_rows:n] = self._to_device(
+                self._doc_matrix[self._gpu_rows:n], self._scales[self._gpu_rows:n]
             )
-            results.append((row["ID"], similarity, row["Text"]))
+        self._gpu_rows = n
+    
+    def _rank_gpu(
+        self,
+        queries: np.ndarray[Any, np.dtype[np.float32]],
+        top_k: int
+    ) -> tuple[np.ndarray[Any, np.dtype[np.intp]], np.ndarray[Any, np.dtype[np.float32]]]:
+        """Score and select the best documents against the GPU mirror.
         
-        # Sort by similarity (descending) and return top_k
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results[:top_k]
+        Only the top_k indices and scores per query are copied back to the
+        host.
+        
+        Args:
+            queries: L2-normalized float32 query vectors, one per row.
+            top_k: Number of documents to return per query.
+            
+        Returns:
+            Row indices and their cosine similarity per query, best first.
+        """
+        scores = cupy.asarray(queries) @ self._gpu_buffer[:self._gpu_rows].T
+        top_idx = self._top_k_indices(scores, top_k, xp=cupy)
+        top_scores = cupy.take_along_axis(scores, top_idx, axis=1)
+        return cupy.asnumpy(top_idx).astype(np.intp), cupy.asnumpy(top_scores)
+    
+    @staticmethod
+    def _top_k_indices(
+        scores: np.ndarray[Any, np.dtype[np.float32]],
+        top_k: int,
+        xp: Any = np
+    ) -> np.ndarray[Any, np.dtype[np.intp]]:
+        """Indices of the top_k highest scores along the last axis, best first.
+        
+        Uses an O(N) partition to find the top_k and only sorts those, rather
+        than sorting every score. A 2-D array of scores is handled per row in
+        a single call.
+        
+        Args:
+            scores: Score of each document, optionally one row per query.
+            top_k: Number of indices to return.
+            xp: Array module holding scores, NumPy or CuPy.
+            
+        Returns:
+            Indices into the last axis of scores sorted by descending score.
+        """
+        if top_k >= scores.shape[-1]:
+            return cast(np.ndarray[Any, np.dtype[np.intp]], xp.argsort(-scores, axis=-1, kind="stable"))
+        
+        top_idx = xp.argpartition(-scores, top_k - 1, axis=-1)[..., :top_k]
+        top_scores = xp.take_along_axis(scores, top_idx, axis=-1)
+        order = xp.argsort(-top_scores, axis=-1, kind="stable")
+        return cast(np.ndarray[Any, np.dtype[np.intp]], xp.take_along_axis(top_idx, order, axis=-1))
+    
+    def _score(
+        self,
+        queries: np.ndarray[Any, np.dtype[np.float32]],
+        rows: slice = slice(None)
+    ) -> np.ndarray[Any, np.dtype[np.float32]]:
+        """Score stored documents against each normalized query.
+        
+        Args:
+            queries: L2-normalized float32 query vectors, one per row.
+            rows: Range of documents to score; all of them by default.
+            
+        Returns:
+            Cosine similarity of each document to each query, one row per query.
+        """
+        doc_matrix = self._doc_matrix[rows]
+        if simsimd is not None and self.precision == "int8":
+            # int8 rows are multiplied with the queries quantized the same way
+            # and the products scaled back. Unlike the cosine metric, this
+            # scores zero vectors 0 like the other precisions.
+            quantized, query_scales = self._to_storage(queries)
+            products = np.asarray(
+                simsimd.cdist(quantized, doc_matrix, metric="dot"), dtype=np.float32
+            )
+            products *= query_scales[:, np.newaxis]
+            products *= self._scales[rows]
+            return products
+        
+        if simsimd is not None and doc_matrix.dtype != np.float32:
+            # SimSIMD's mixed-precision kernels read the matrix in its storage
+            # dtype instead of upcasting a float32 copy on every query
+            return np.asarray(
+                simsimd.cdist(queries.astype(doc_matrix.dtype), doc_matrix, metric="dot"),
+                dtype=np.float32
+            )
+        
+        if doc_matrix.dtype == np.float32:
+            scores = np.asarray(queries @ doc_matrix.T, dtype=np.float32)
+        else:
+            # Upcasting the whole matrix per query would write a float32 copy
+            # larger than the stored one, so it is done one small block at a time
+            scores = np.empty((len(queries), len(doc_matrix)), dtype=np.float32)
+            for start in range(0, len(doc_matrix), UPCAST_BLOCK_ROWS):
+                block = slice(start, start + UPCAST_BLOCK_ROWS)
+                scores[:, block] = queries @ doc_matrix[block].astype(np.float32).T
+        if self.precision == "int8":
+            scores *= self._scales[rows]
+        return scores
     
     async def _get_embedding_with_retry(
         self, 
         text: str, 
-        max_retries: int
-    ) -> List[float]:
+        max_retries: int,
+        max_delay: float = MAX_RETRY_DELAY
+    ) -> np.ndarray[Any, np.dtype[np.float32]]:
         """Get embedding with exponential backoff retry logic.
         
+        Embeddings are kept in an in-process LRU cache keyed by text, so a
+        repeated query is embedded only once regardless of top_k or whether
+        the result cache is used. Misses go through the request batcher, which
+        coalesces concurrent queries into one embedding call.
+        
+        Embeddings are converted to contiguous float32 once, here, so scoring
+        never upcasts to float64 or copies the query per search.
+        
         Args:
             text: Text to embed.
             max_retries: Maximum number of retry attempts.
+            max_delay: Upper bound in seconds on the wait between attempts.
             
         Returns:
-            Embedding vector.
+            Read-only float32 embedding vector, shared with the cache.
             
         Raises:
             FlakyNetworkException: If all retries fail.
         """
+        cached = self._embedding_cache.get(text)
+        if cached is not None:
+            self._embedding_cache.move_to_end(text)
+            return cached
+        
         for attempt in range(max_retries):
             try:
-                return await self.embedding_service.embed(text)
+                embedding = np.ascontiguousarray(await self._batcher.submit(text), dtype=np.float32)
             except FlakyNetworkException:
                 if attempt == max_retries - 1:
                     logger.error(f"Failed after {max_retries} attempts")
                     raise
                 
-                wait_time = 2 ** attempt  # Exponential backoff
+                # Exponential backoff, bounded so long retry chains converge
+                wait_time = min(max_delay, _RETRY_DELAYS[min(attempt, len(_RETRY_DELAYS) - 1)])
                 logger.warning(
                     f"Network error on attempt {attempt + 1}, "
                     f"retrying in {wait_time}s"
                 )
                 await asyncio.sleep(wait_time)
+            else:
+                embedding.flags.writeable = False
+                if self.embedding_cache_size > 0:
+                    self._embedding_cache[text] = embedding
+                    if len(self._embedding_cache) > self.embedding_cache_size:
+                        self._embedding_cache.popitem(last=False)
+                return embedding
         
         raise FlakyNetworkException("Should not reach here")
     
@@ -100,6 +982,9 @@ class VectorSearchDatabase(AsyncEmbeddingDatabase):
     def _cosine_similarity(vec1: np.ndarray[Any, np.dtype[np.float64]], vec2: np.ndarray[Any, np.dtype[np.float64]]) -> float:
         """Calculate cosine similarity between two vectors.
         
+        Reference implementation only: search normalizes documents at ingest
+        and queries once per request, then scores with plain dot products.
+        
         Args:
             vec1: First vector.
             vec2: Second vector.
@@ -107,28 +992,39 @@ class VectorSearchDatabase(AsyncEmbeddingDatabase):
         Returns:
             Cosine similarity score between -1 and 1.
         """
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
+        # One sqrt of the squared norms' product instead of two norm calls
+        norm_product = np.sqrt(np.vdot(vec1, vec1) * np.vdot(vec2, vec2))
         
-        if norm1 == 0 or norm2 == 0:
+        if norm_product == 0:
             return 0.0
         
-        return float(dot_product / (norm1 * norm2))
+        return float(np.dot(vec1, vec2) / norm_product)
 
 
 # Add the cached version below the original class
 class CachedVectorSearchDatabase(VectorSearchDatabase):
     """Vector search database with Redis caching."""
     
-    def __init__(self, cache_path: Path, redis_url: str = "redis://localhost:6379"):
+    def __init__(
+        self,
+        cache_path: Path,
+        redis_url: str = "redis://localhost:6379",
+        precision: str = "float32",
+        use_ann: bool = False,
+        embedding_cache_size: int = EMBEDDING_CACHE_SIZE,
+        use_gpu: bool = False
+    ):
         """Initialize cached vector search database.
         
         Args:
             cache_path: Path to the cache file where the database is stored.
             redis_url: Redis connection URL.
+            precision: Storage dtype of the in-memory document matrix.
+            use_ann: Answer queries from an approximate HNSW index.
+            embedding_cache_size: Number of query embeddings kept in the LRU cache.
+            use_gpu: Score exact searches on a CUDA device.
         """
-        super().__init__(cache_path)
+        super().__init__(cache_path, precision, use_ann, embedding_cache_size, use_gpu)
         self.cache = RedisCache(redis_url)
     
     async def setup(self) -> None:
@@ -154,20 +1050,135 @@ class CachedVectorSearchDatabase(VectorSearchDatabase):
         Returns:
             List of tuples containing (id, similarity_score, text) sorted by similarity.
         """
-        # Check cache first
-        if use_cache:
-            cached_results = await self.cache.get(query_text, top_k)
-            if cached_results is not None:
-                return cached_results
+        results, _ = await self.search_with_cache_status(query_text, top_k, max_retries, use_cache)
+        return results
+    
+    async def search_with_cache_status(
+        self, 
+        query_text: str, 
+        top_k: int = 5,
+        max_retries: int = 3,
+        use_cache: bool = True
+    ) -> Tuple[List[Tuple[str, float, str]], bool]:
+        """Search with caching support, reporting whether the cache was hit.
+        
+        Args:
+            query_text: Text to search for.
+            top_k: Number of results to return.
+            max_retries: Maximum number of retries for network errors.
+            use_cache: Whether to use cache.
+            
+        Returns:
+            Tuple of the results, as (id, similarity_score, text) tuples sorted by
+            similarity, and whether they were served from the cache.
+        """
+        if not use_cache:
+            return await super().search(query_text, top_k, max_retries), False
         
-        # Perform search
-        results = await super().search(query_text, top_k, max_retries)
+        # Look up the cache while the query is embedded, so a miss costs the
+        # slower of the two rather than both. The key is hashed once for both
+        # lookup and store.
+        key = self.cache._generate_cache_key(query_text, top_k)
+        cache_task = asyncio.create_task(self.cache.get_by_key(key))
+        embed_task = asyncio.create_task(
+            self._get_embedding_with_retry(query_text, max_retries)
+        )
+        try:
+            cached_results = await cache_task
+        except asyncio.CancelledError:
+            await self._cancel(embed_task)
+            raise
         
-        # Cache results
-        if use_cache:
-            await self.cache.set(query_text, top_k, results)
+        if cached_results is not None:
+            await self._cancel(embed_task)
+            return cached_results, True
         
-        return results
+        # Perform search and cache results
+        results = self._search_embeddings([await embed_task], top_k)[0]
+        await self.cache.set_by_key(key, results)
+        
+        return results, False
+    
+    @staticmethod
+    async def _cancel(task: asyncio.Task[Any]) -> None:
+        """Cancel a task and wait for it to finish.
+        
+        Awaiting it retrieves any exception it already raised, which asyncio
+        would otherwise log as never retrieved.
+        
+        Args:
+            task: The task to cancel.
+        """
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await task
+    
+    async def search_batch(
+        self, 
+        query_texts: List[str], 
+        top_k: int = 5,
+        max_retries: int = 3,
+        use_cache: bool = True
+    ) -> List[List[Tuple[str, float, str]]]:
+        """Search for several queries at once with caching support.
+        
+        Args:
+            query_texts: Texts to search for.
+            top_k: Number of results to return per query.
+            max_retries: Maximum number of retries for network errors.
+            use_cache: Whether to use cache.
+            
+        Returns:
+            One result list per query, in the order of query_texts.
+        """
+        batch, _ = await self.search_batch_with_cache_status(
+            query_texts, top_k, max_retries, use_cache
+        )
+        return batch
+    
+    async def search_batch_with_cache_status(
+        self, 
+        query_texts: List[str], 
+        top_k: int = 5,
+        max_retries: int = 3,
+        use_cache: bool = True
+    ) -> Tuple[List[List[Tuple[str, float, str]]], List[bool]]:
+        """Search for several queries at once, reporting which hit the cache.
+        
+        All cache lookups go out in one MGET, and only the misses are
+        embedded and searched before being stored with one pipelined write.
+        
+        Args:
+            query_texts: Texts to search for.
+            top_k: Number of results to return per query.
+            max_retries: Maximum number of retries for network errors.
+            use_cache: Whether to use cache.
+            
+        Returns:
+            Tuple of one result list per query, in the order of query_texts,
+            and whether each was served from the cache.
+        """
+        if not use_cache:
+            batch = await super().search_batch(query_texts, top_k, max_retries)
+            return batch, [False] * len(query_texts)
+        
+        cached = await self.cache.mget([(text, top_k) for text in query_texts])
+        hits = [entry is not None for entry in cached]
+        misses = [i for i, hit in enumerate(hits) if not hit]
+        
+        fresh: List[List[Tuple[str, float, str]]] = []
+        if misses:
+            fresh = await super().search_batch(
+                [query_texts[i] for i in misses], top_k, max_retries
+            )
+            await self.cache.mset(
+                [(query_texts[i], top_k, found) for i, found in zip(misses, fresh)]
+            )
+        
+        # Misses take the fresh results in order, hits keep the cached ones
+        fresh_results = iter(fresh)
+        merged = [entry if entry is not None else next(fresh_results) for entry in cached]
+        return merged, hits
     
     async def close(self):
         """Close database and cache connections."""
@@ -0,0 +1,71 @@
+"""Tests for the embedding request batcher."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from embedding_server.embedding_batcher import EmbeddingBatcher
+from embedding_server.gibson.exceptions import FlakyNetworkException
+
+
+@pytest.mark.asyncio
+async def test_single_request_uses_embed() -> None:
+    """Test a lone request is sent through the single-text endpoint."""
+    service = MagicMock()
+    service.embed = AsyncMock(return_value=[0.5] * 768)
+    service.embed_batch = AsyncMock()
+    batcher = EmbeddingBatcher(service)
+
+    result = await batcher.submit("hello")
+
+    assert result == [0.5] * 768
+    service.embed.assert_awaited_once_with("hello")
+    service.embed_batch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced() -> None:
+    """Test concurrent requests share one batched call, deduplicating texts."""
+    service = MagicMock()
+    service.embed_batch = AsyncMock(return_value=[[1.0] * 768, [2.0] * 768])
+    batcher = EmbeddingBatcher(service)
+
+    results = await asyncio.gather(
+        batcher.submit("first"),
+        batcher.submit("second"),
+        batcher.submit("first"),
+    )
+
+    assert results == [[1.0] * 768, [2.0] * 768, [1.0] * 768]
+    service.embed_batch.assert_awaited_once_with(["first", "second"])
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_immediately() -> None:
+    """Test reaching max_batch_size flushes without waiting for the timer."""
+    service = MagicMock()
+    service.embed_batch = AsyncMock(return_value=[[1.0] * 768, [2.0] * 768])
+    batcher = EmbeddingBatcher(service, max_batch_size=2, max_wait=60)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.submit("first"), batcher.submit("second")),
+        timeout=1,
+    )
+
+    assert results == [[1.0] * 768, [2.0] * 768]
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_every_caller() -> None:
+    """Test a failed batch raises in each waiting coroutine."""
+    service = MagicMock()
+    service.embed_batch = AsyncMock(side_effect=FlakyNetworkException("Network error"))
+    batcher = EmbeddingBatcher(service)
+
+    results = await asyncio.gather(
+        batcher.submit("first"),
+        batcher.submit("second"),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, FlakyNetworkException) for result in results)
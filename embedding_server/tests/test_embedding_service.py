@@ -7,6 +7,7 @@ import os
 from pathlib import Path
 
 import aiofiles
+import orjson
 import pytest
 
 from embedding_server.gibson.database import AsyncEmbeddingDatabase
@@ -77,3 +78,29 @@ async def test_async_insert(tmp_path: Path) -> None:
         assert (
             len(json_content["Embeddings"]) == counter
         ), "Mismatch in the number of inserted Embeddings."
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "content",
+    [
+        {"ID": ["a", "b"], "Text": ["A", "B"], "Embeddings": [[0.1], [0.2]]},
+        {"ID": {"0": "a", "1": "b"}, "Text": {"0": "A", "1": "B"}, "Embeddings": {"0": [0.1], "1": [0.2]}},
+        [{"ID": "a", "Text": "A", "Embeddings": [0.1]}, {"ID": "b", "Text": "B", "Embeddings": [0.2]}],
+    ],
+)
+async def test_read_json_layouts(tmp_path: Path, content: object) -> None:
+    """Tests the column and record JSON layouts all load the same rows.
+
+    Args:
+        tmp_path: A pathlib.Path object provided by the pytest framework for creating temporary files and directories.
+        content: JSON document to write to the database file.
+    """
+    path = tmp_path / "testdb.json"
+    path.write_bytes(orjson.dumps(content))
+
+    data = await AsyncEmbeddingDatabase._read_json(path)
+
+    assert data["ID"].tolist() == ["a", "b"]
+    assert data["Text"].tolist() == ["A", "B"]
+    assert data["Embeddings"].tolist() == [[0.1], [0.2]]
@@ -0,0 +1,131 @@
+"""Tests for the Redis search-result cache."""
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import orjson
+import pytest
+import redis.asyncio as redis
+
+
+from embedding_server.redis_cache import RedisCache
+
+
+class FakeConnection(redis.Connection):
+    """Connection that answers every command with one cached result, without a server."""
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def connect(self) -> None:
+        pass
+
+    async def disconnect(self, nowait: bool = False) -> None:
+        pass
+
+    async def can_read_destructive(self) -> bool:
+        return False
+
+    async def send_packed_command(self, command: Any, check_health: bool = True) -> None:
+        FakeConnection.in_flight += 1
+        FakeConnection.max_in_flight = max(FakeConnection.max_in_flight, FakeConnection.in_flight)
+
+    async def read_response(self, *args: Any, **kwargs: Any) -> bytes:
+        await asyncio.sleep(0.01)
+        FakeConnection.in_flight -= 1
+        return orjson.dumps([["id1", 0.9, "Text"]])
+
+
+@pytest.fixture
+def cache() -> RedisCache:
+    """Redis cache wired to a mocked client."""
+    cache = RedisCache()
+    cache.redis_client = MagicMock()
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_mget_uses_single_round_trip(cache: Any) -> None:
+    """Test mget looks up every query with one MGET call."""
+    cached = [["id1", 0.9, "First"]]
+    cache.redis_client.mget = AsyncMock(return_value=[orjson.dumps(cached), None])
+
+    results = await cache.mget([("first", 5), ("second", 5)])
+
+    assert results == [cached, None]
+    cache.redis_client.mget.assert_awaited_once_with([
+        cache._generate_cache_key("first", 5),
+        cache._generate_cache_key("second", 5),
+    ])
+
+
+@pytest.mark.asyncio
+async def test_mset_pipelines_writes(cache: Any) -> None:
+    """Test mset queues every write on one pipeline."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    cache.redis_client.pipeline.return_value.__aenter__.return_value = pipe
+
+    await cache.mset([
+        ("first", 5, [("id1", 0.9, "First")]),
+        ("second", 5, [("id2", 0.8, "Second")]),
+    ])
+
+    cache.redis_client.pipeline.assert_called_once_with(transaction=False)
+    assert pipe.setex.call_count == 2
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_clear_pipelines_unlinks(cache: Any) -> None:
+    """Test clear unlinks every scanned batch in one pipeline."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    cache.redis_client.pipeline.return_value.__aenter__.return_value = pipe
+    cache.redis_client.scan = AsyncMock(side_effect=[(7, [b"k1", b"k2"]), (0, [b"k3"])])
+
+    await cache.clear()
+
+    assert pipe.unlink.call_args_list == [((b"k1", b"k2"),), ((b"k3",),)]
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_mget_without_connection() -> None:
+    """Test mget reports misses when Redis is unavailable."""
+    cache = RedisCache()
+
+    assert await cache.mget([("first", 5), ("second", 5)]) == [None, None]
+
+
+@pytest.mark.asyncio
+async def test_connect_warms_pool() -> None:
+    """Test connect pings once per pooled connection."""
+    cache = RedisCache(max_connections=4)
+
+    with patch("embedding_server.redis_cache.redis.Redis") as client_cls:
+        client_cls.return_value.ping = AsyncMock()
+        await cache.connect()
+
+    assert cache._pool is not None and cache._pool.max_connections == 4
+    client_cls.assert_called_once_with(connection_pool=cache._pool)
+    assert cache.redis_client.ping.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_requests_beyond_pool_size_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test more concurrent lookups than pooled connections all succeed."""
+    from_url = redis.BlockingConnectionPool.from_url.__func__  # type: ignore[attr-defined]
+    monkeypatch.setattr(
+        redis.BlockingConnectionPool,
+        "from_url",
+        classmethod(lambda cls, url, **kwargs: from_url(cls, url, connection_class=FakeConnection, **kwargs)),
+    )
+    cache = RedisCache(max_connections=2)
+    await cache.connect()
+
+    results = await asyncio.gather(*(cache.get_by_key(f"key{i}") for i in range(6)))
+
+    assert results == [[["id1", 0.9, "Text"]]] * 6
+    assert FakeConnection.max_in_flight == 2
+    await cache.disconnect()
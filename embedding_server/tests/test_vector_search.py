@@ -1,44 +1,86 @@
 """Tests for vector search functionality."""
+import asyncio
+import os
+import stat
+import subprocess
+import sys
 from collections.abc import AsyncGenerator
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import numpy as np
+import orjson
 import pandas as pd
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
 
 from embedding_server.gibson.exceptions import FlakyNetworkException
-from embedding_server.server import app
+from embedding_server.server import MAX_BATCH_QUERIES, app
+from embedding_server.vector_search import (
+    _RETRY_DELAYS,
+    STORAGE_DTYPES,
+    CachedVectorSearchDatabase,
+    VectorSearchDatabase,
+)
+
+# Simple embeddings for the fixture documents, built once for the module
+FIXTURE_EMBEDDINGS = np.repeat(np.array([[0.1], [0.2], [0.3]], dtype=np.float32), 768, axis=1)
+
+# Run in a separate worker process: open the database at argv[1] in precision
+# argv[2] and print whether its matrix is memory-mapped and the top 3 results
+# for the query embedding in argv[3]
+WORKER_SCRIPT = """
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import orjson
+
 from embedding_server.vector_search import VectorSearchDatabase
 
 
+async def main() -> None:
+    db = VectorSearchDatabase(Path(sys.argv[1]), precision=sys.argv[2])
+    await db.setup()
+    query = np.array(orjson.loads(sys.argv[3]), dtype=np.float32)
+    results = db._search_embeddings([query], 3)[0]
+    sys.stdout.buffer.write(orjson.dumps([isinstance(db._doc_matrix, np.memmap), results]))
+
+
+asyncio.run(main())
+"""
+
+
 @pytest_asyncio.fixture
 async def test_db(tmp_path: Path) -> AsyncGenerator[VectorSearchDatabase, None]:
-    """Create a test database with sample data."""
+    """Create a test database with sample data, served from its sidecars."""
     db_path = tmp_path / "test_embeddings.json"
+    writer = VectorSearchDatabase.from_arrays(
+        db_path,
+        ids=["id1", "id2", "id3"],
+        texts=["Hello world", "Python programming", "Machine learning"],
+        embeddings=FIXTURE_EMBEDDINGS
+    )
+    await writer._save()  # writes the JSON and the .npy and .parquet sidecars
+
+    # A fresh instance memory-maps the matrix, as on a server restart
     db = VectorSearchDatabase(db_path)
-
-    # Create sample data
-    sample_data = pd.DataFrame({
-        "ID": ["id1", "id2", "id3"],
-        "Text": ["Hello world", "Python programming", "Machine learning"],
-        "Embeddings": [
-            [0.1] * 768,  # Simple embeddings for testing
-            [0.2] * 768,
-            [0.3] * 768
-        ]
-    })
-
-    db.data = sample_data
-    await db._save()
     await db.setup()
 
     yield db
 
 
+@pytest_asyncio.fixture(scope="module")
+async def client() -> AsyncGenerator[AsyncClient, None]:
+    """One ASGI client shared by the endpoint tests in this module."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
 @pytest.fixture
 def mock_embedding_service() -> Any:
     """Mock embedding service to avoid real API calls."""
@@ -49,6 +91,22 @@ def mock_embedding_service() -> Any:
         yield instance
 
 
+@pytest.fixture
+def fake_sleep(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Replace asyncio.sleep with a virtual clock that returns immediately.
+
+    Returns:
+        The requested delays, in call order.
+    """
+    delays: list[float] = []
+
+    async def sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return delays
+
+
 class TestVectorSearchDatabase:
     """Test cases for VectorSearchDatabase class."""
 
@@ -72,6 +130,407 @@ class TestVectorSearchDatabase:
 
         assert len(results) == 3  # Only 3 items in test db
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("precision", ["float32", "float16", "int8"])
+    async def test_search_ranks_by_cosine(
+        self, tmp_path: Path, mock_embedding_service: Any, precision: str
+    ) -> None:
+        """Test search orders results by cosine similarity to the query."""
+        db = VectorSearchDatabase(tmp_path / "ranking.json", precision=precision)
+        db.data = {
+            "ID": ["near", "far", "mid"],
+            "Text": ["Near", "Far", "Mid"],
+            "Embeddings": [
+                [1.0] + [0.0] * 767,
+                [0.0] + [1.0] * 767,
+                [1.0] * 768,
+            ]
+        }
+        await db._save()
+        await db.setup()
+        db.embedding_service = mock_embedding_service
+        mock_embedding_service.embed.return_value = [2.0] + [0.0] * 767
+
+        results = await db.search("test query", top_k=3)
+
+        assert [result[0] for result in results] == ["near", "mid", "far"]
+        assert abs(results[0][1] - 1.0) < 1e-6
+        assert abs(results[2][1]) < 1e-6
+
+    @pytest.mark.asyncio
+    async def test_setup_from_sidecars(self, test_db: VectorSearchDatabase, mock_embedding_service: Any) -> None:
+        """Test a fresh instance loads the binary sidecars instead of the JSON."""
+        db = test_db
+        db.embedding_service = mock_embedding_service
+
+        assert db.matrix_path.exists() and db.metadata_path.exists()
+        assert not hasattr(db, "data")  # JSON was never parsed
+        assert isinstance(db._doc_matrix, np.memmap)  # searched in place
+        assert np.allclose(np.linalg.norm(db._doc_matrix, axis=1), 1.0)
+        assert {r[0] for r in await db.search("test query", top_k=3)} == {"id1", "id2", "id3"}
+
+        await db.insert(text="New entry", embeddings=[0.4] * 768)
+        assert len(await db.search("test query", top_k=10)) == 4
+
+        reloaded = VectorSearchDatabase(db.cache_path)
+        await reloaded.setup()
+        assert isinstance(reloaded._doc_matrix, np.memmap)
+        assert reloaded._ids.tolist() == db._ids.tolist()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("precision", ["float32", "float16", "int8"])
+    async def test_sidecars_shared_in_precision(
+        self, tmp_path: Path, mock_embedding_service: Any, precision: str
+    ) -> None:
+        """Test every precision is memory-mapped as stored, so worker processes share one copy."""
+        rng = np.random.default_rng(0)
+        writer = VectorSearchDatabase.from_arrays(
+            tmp_path / "shared.json", ["a", "b", "c"], ["A", "B", "C"],
+            rng.normal(size=(3, 768)), precision=precision
+        )
+        await writer._save()
+
+        worker = VectorSearchDatabase(writer.cache_path, precision=precision)
+        await worker.setup()
+        worker.embedding_service = mock_embedding_service
+        query = rng.normal(size=768).tolist()
+        mock_embedding_service.embed.return_value = query
+
+        assert all(path.exists() for path in writer.sidecar_paths)
+        assert isinstance(worker._doc_matrix, np.memmap)
+        assert worker._doc_matrix.dtype == writer._doc_matrix.dtype
+        assert np.array_equal(worker._scales, writer._scales)
+        results = await worker.search("query", top_k=3)
+        assert results == await writer.search("query", top_k=3)
+
+        other = subprocess.run(
+            [sys.executable, "-c", WORKER_SCRIPT, str(writer.cache_path), precision, orjson.dumps(query)],
+            capture_output=True, check=True
+        )
+        memmapped, other_results = orjson.loads(other.stdout)
+        assert memmapped
+        assert other_results == [list(result) for result in results]
+
+    @pytest.mark.asyncio
+    async def test_setup_leaves_json_untouched(self, tmp_path: Path) -> None:
+        """Test rebuilding the sidecars keeps the JSON as is, and saves keep its float64 values."""
+        rng = np.random.default_rng(0)
+        db_path = tmp_path / "legacy.json"
+        embeddings = rng.standard_normal((3, 768))
+        pd.DataFrame({
+            "ID": ["a", "b", "c"], "Text": ["A", "B", "C"], "Embeddings": embeddings.tolist()
+        }).to_json(db_path, index=False)
+        content = db_path.read_bytes()
+
+        db = VectorSearchDatabase(db_path)
+        await db.setup()
+
+        assert db_path.read_bytes() == content
+        assert db._sidecars_are_fresh()
+
+        await db.insert(text="New entry", embeddings=[0.4] * 768)
+        saved = VectorSearchDatabase._parse_columns(db_path)["Embeddings"]
+        assert saved[:3] == list(orjson.loads(content)["Embeddings"].values())
+
+    @pytest.mark.asyncio
+    async def test_insert_grows_arrays(self, test_db: VectorSearchDatabase) -> None:
+        """Test inserts append past the buffer capacity and are persisted."""
+        for i in range(20):
+            await test_db.insert(text=f"Entry {i}", embeddings=[float(i + 1)] * 768)
+
+        assert test_db._doc_matrix.shape == (23, 768)
+        assert len(test_db._buffers[0]) > 23  # capacity doubled ahead of use
+        with pytest.raises(ValueError):
+            await test_db.insert(text="Entry 0", embeddings=[1.0] * 768)
+
+        reloaded = VectorSearchDatabase(test_db.cache_path)
+        reloaded.data = await reloaded._read_json(test_db.cache_path)
+        assert reloaded._ids.tolist() == test_db._ids.tolist()
+        assert np.array_equal(reloaded._doc_matrix, test_db._doc_matrix)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_inserts_are_all_persisted(self, test_db: VectorSearchDatabase) -> None:
+        """Test concurrent inserts after a sidecar-backed setup keep every row on disk."""
+        texts = [f"Concurrent {i}" for i in range(6)]
+        await asyncio.gather(*(
+            test_db.insert(text=text, embeddings=[float(i + 1)] * 768) for i, text in enumerate(texts)
+        ))
+
+        assert len(test_db._ids) == 9
+        assert len(orjson.loads(test_db.cache_path.read_bytes())["ID"]) == 9
+        assert not list(test_db.cache_path.parent.glob("*.tmp"))
+
+        reloaded = VectorSearchDatabase(test_db.cache_path)
+        await reloaded.setup()
+        assert isinstance(reloaded._doc_matrix, np.memmap)  # sidecars are fresh
+        assert sorted(reloaded._texts.tolist()) == sorted(test_db._texts.tolist())
+
+    @pytest.mark.asyncio
+    async def test_saves_keep_file_modes(self, test_db: VectorSearchDatabase) -> None:
+        """Test replaced files keep their mode and new ones get the umask default."""
+        umask = os.umask(0)
+        os.umask(umask)
+        paths = (test_db.cache_path, *test_db.sidecar_paths)
+        assert all(stat.S_IMODE(path.stat().st_mode) == 0o666 & ~umask for path in paths)
+
+        test_db.cache_path.chmod(0o640)
+        test_db.matrix_path.chmod(0o604)
+        await test_db.insert(text="New entry", embeddings=[0.4] * 768)
+
+        assert stat.S_IMODE(test_db.cache_path.stat().st_mode) == 0o640
+        assert stat.S_IMODE(test_db.matrix_path.stat().st_mode) == 0o604
+
+    @pytest.mark.asyncio
+    async def test_search_with_ann_index(self, tmp_path: Path, mock_embedding_service: Any) -> None:
+        """Test the HNSW index matches exact search and survives a reload."""
+        pytest.importorskip("hnswlib")
+        db_path = tmp_path / "ann.json"
+        exact = VectorSearchDatabase(db_path)
+        exact.data = {
+            "ID": ["near", "far", "mid"],
+            "Text": ["Near", "Far", "Mid"],
+            "Embeddings": [
+                [1.0] + [0.0] * 767,
+                [0.0, 1.0] + [0.0] * 766,
+                [1.0, 1.0] + [0.0] * 766,
+            ]
+        }
+        await exact._save()
+        await exact.setup()
+        exact.embedding_service = mock_embedding_service
+        mock_embedding_service.embed.return_value = [1.0, 0.2] + [0.0] * 766
+        expected = await exact.search("test query", top_k=3)
+
+        db = VectorSearchDatabase(db_path, use_ann=True)
+        db.embedding_service = mock_embedding_service
+        await db.setup()
+        results = await db.search("test query", top_k=3)
+
+        assert db.ann_index_path.exists()
+        assert [r[0] for r in results] == ["near", "mid", "far"]
+        assert np.allclose([r[1] for r in results], [r[1] for r in expected], atol=1e-5)
+
+        reloaded = VectorSearchDatabase(db_path, use_ann=True)
+        reloaded.embedding_service = mock_embedding_service
+        await reloaded.setup()
+        await reloaded.insert(text="New entry", embeddings=[1.0, 0.1] + [0.0] * 766)
+
+        assert reloaded._ann_index.get_current_count() == 4
+        assert (await reloaded.search("test query", top_k=1))[0][2] == "New entry"
+
+    @pytest.mark.asyncio
+    async def test_ann_search_during_pending_insert(self, tmp_path: Path, mock_embedding_service: Any) -> None:
+        """Test a row appended but not yet indexed is still found while its save waits."""
+        pytest.importorskip("hnswlib")
+        db = VectorSearchDatabase.from_arrays(
+            tmp_path / "pending.json", ["a", "b"], ["A", "B"],
+            [[1.0] + [0.0] * 767, [0.0, 1.0] + [0.0] * 766], use_ann=True
+        )
+        await db._save()
+        await db.setup()
+        db.embedding_service = mock_embedding_service
+        mock_embedding_service.embed.return_value = [0.0, 0.0, 1.0] + [0.0] * 765
+
+        async with db._save_lock:
+            insert = asyncio.create_task(db.insert(text="New entry", embeddings=[0.0, 0.0, 1.0] + [0.0] * 765))
+            while len(db._ids) < 3:
+                await asyncio.sleep(0.01)
+            results = await db.search("test query", top_k=3)
+        await insert
+
+        assert [r[2] for r in results] == ["New entry", "A", "B"]
+        assert db._ann_index.get_current_count() == 3
+
+    @pytest.mark.asyncio
+    async def test_search_matches_pairwise_cosine(self, tmp_path: Path, mock_embedding_service: Any) -> None:
+        """Test batched matrix scoring agrees with the pairwise cosine reference."""
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((50, 768))
+        query = rng.standard_normal(768)
+        db = VectorSearchDatabase(tmp_path / "random.json")
+        db.data = {
+            "ID": [f"id{i}" for i in range(50)],
+            "Text": [f"Text {i}" for i in range(50)],
+            "Embeddings": embeddings.tolist(),
+        }
+        db.embedding_service = mock_embedding_service
+        mock_embedding_service.embed.return_value = query.tolist()
+
+        results = await db.search("test query", top_k=10)
+
+        expected = sorted(
+            ((f"id{i}", db._cosine_similarity(row, query)) for i, row in enumerate(embeddings)),
+            key=lambda pair: -pair[1],
+        )[:10]
+        assert [r[0] for r in results] == [pair[0] for pair in expected]
+        assert np.allclose([r[1] for r in results], [pair[1] for pair in expected], atol=1e-5)
+
+    @pytest.mark.parametrize("precision", ["float16", "int8"])
+    def test_score_simsimd_matches_numpy(self, monkeypatch: pytest.MonkeyPatch, precision: str) -> None:
+        """Test the SimSIMD kernels agree with the NumPy fallback."""
+        pytest.importorskip("simsimd")
+        rng = np.random.default_rng(0)
+        db = VectorSearchDatabase(Path("dummy"), precision=precision)
+        db.data = {
+            "ID": [f"id{i}" for i in range(20)],
+            "Text": [f"Text {i}" for i in range(20)],
+            "Embeddings": rng.standard_normal((20, 768)).tolist(),
+        }
+        queries = db._normalize_rows(rng.standard_normal((2, 768)).astype(np.float32))
+
+        fast = db._score(queries)
+        monkeypatch.setattr("embedding_server.vector_search.simsimd", None)
+
+        assert fast.shape == (2, 20)
+        assert np.allclose(fast, db._score(queries), atol=5e-3)
+        assert np.allclose(fast, queries @ db._normalize_rows(db._embeddings).T, atol=5e-3)
+
+    @pytest.mark.parametrize("precision", ["float16", "int8"])
+    def test_score_upcasts_in_blocks(self, monkeypatch: pytest.MonkeyPatch, precision: str) -> None:
+        """Test the NumPy fallback scores low-precision rows block by block."""
+        rng = np.random.default_rng(0)
+        db = VectorSearchDatabase.from_arrays(
+            Path("dummy"), [f"id{i}" for i in range(20)], [f"Text {i}" for i in range(20)],
+            rng.standard_normal((20, 768)), precision=precision
+        )
+        queries = db._normalize_rows(rng.standard_normal((2, 768)).astype(np.float32))
+        monkeypatch.setattr("embedding_server.vector_search.simsimd", None)
+        monkeypatch.setattr("embedding_server.vector_search.UPCAST_BLOCK_ROWS", 7)
+
+        scores = db._score(queries)
+
+        assert scores.dtype == np.float32
+        assert np.allclose(scores, queries @ db._dequantize(slice(None)).T, atol=1e-5)
+        assert np.allclose(db._score(queries, slice(5, 15)), scores[:, 5:15])
+
+    @pytest.mark.asyncio
+    async def test_search_in_chunks(
+        self, test_db: VectorSearchDatabase, mock_embedding_service: Any, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test scoring the matrix in blocks keeps the ordering of a single pass."""
+        test_db.embedding_service = mock_embedding_service
+        mock_embedding_service.embed.return_value = [1.0] + [0.0] * 767
+        await test_db.insert(text="Aligned", embeddings=[1.0] + [0.0] * 767)
+        await test_db.insert(text="Opposed", embeddings=[-1.0] + [0.0] * 767)
+        expected = await test_db.search("test query", top_k=3)
+
+        monkeypatch.setattr("embedding_server.vector_search.SCORE_CHUNK_ROWS", 2)
+        results = await test_db.search("test query", top_k=3)
+
+        assert [r[1] for r in results] == [r[1] for r in expected]  # fixture rows tie on score
+        assert results[0][2] == "Aligned"
+        assert "Opposed" not in {r[2] for r in await test_db.search("test query", top_k=4)}
+
+    @pytest.mark.parametrize("precision", ["float32", "float16", "int8"])
+    def test_rank_chunked_matches_single_pass(self, monkeypatch: pytest.MonkeyPatch, precision: str) -> None:
+        """Test blockwise top-k selection returns the same rows and scores per query."""
+        rng = np.random.default_rng(0)
+        db = VectorSearchDatabase.from_arrays(
+            Path("dummy"), [f"id{i}" for i in range(50)], [f"Text {i}" for i in range(50)],
+            rng.standard_normal((50, 768)), precision=precision
+        )
+        queries = db._normalize_rows(rng.standard_normal((3, 768)).astype(np.float32))
+        expected = db._rank(queries, 10)
+
+        monkeypatch.setattr("embedding_server.vector_search.SCORE_CHUNK_ROWS", 7)
+
+        assert np.array_equal(db._rank(queries, 10)[0], expected[0])
+        assert np.allclose(db._rank(queries, 10)[1], expected[1])
+        assert db._rank(queries, 60)[0].shape == (3, 50)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("precision", ["float32", "int8"])
+    async def test_rank_gpu_matches_cpu(self, monkeypatch: pytest.MonkeyPatch, precision: str) -> None:
+        """Test the GPU ranking path agrees with the CPU one, using NumPy in place of CuPy."""
+        fake_cupy = SimpleNamespace(
+            asarray=np.asarray,
+            asnumpy=np.asarray,
+            empty=np.empty,
+            argpartition=np.argpartition,
+            argsort=np.argsort,
+            take_along_axis=np.take_along_axis,
+            cuda=SimpleNamespace(runtime=SimpleNamespace(getDeviceCount=lambda: 1)),
+        )
+        monkeypatch.setattr("embedding_server.vector_search.cupy", fake_cupy)
+        rng = np.random.default_rng(0)
+        db = VectorSearchDatabase.from_arrays(
+            Path("dummy"), [f"id{i}" for i in range(20)], [f"Text {i}" for i in range(20)],
+            rng.standard_normal((20, 768)), precision=precision, use_gpu=True
+        )
+        queries = db._normalize_rows(rng.standard_normal((2, 768)).astype(np.float32))
+        assert db._gpu_buffer is None  # mirrored in setup, scored on the CPU until then
+
+        await db._mirror_to_gpu()
+        for i in range(20, 25):
+            db._append(f"id{i}", f"Text {i}", rng.standard_normal(768).tolist())
+        gpu_idx, gpu_scores = db._rank(queries, 5)
+
+        assert db._gpu_rows == 25 and len(db._gpu_buffer) == 40  # only new rows copied, capacity doubled
+        db.use_gpu = False
+        monkeypatch.setattr("embedding_server.vector_search.simsimd", None)  # same math as the GPU path
+        cpu_idx, cpu_scores = db._rank(queries, 5)
+        assert np.array_equal(gpu_idx, cpu_idx)
+        assert np.allclose(gpu_scores, cpu_scores, atol=1e-5)
+
+    def test_gpu_needs_a_device(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test use_gpu falls back to the CPU when CuPy sees no device."""
+        def no_device() -> int:
+            raise RuntimeError("cudaErrorNoDevice")
+
+        fake_cupy = SimpleNamespace(cuda=SimpleNamespace(runtime=SimpleNamespace(getDeviceCount=no_device)))
+        monkeypatch.setattr("embedding_server.vector_search.cupy", fake_cupy)
+
+        assert not VectorSearchDatabase(Path("dummy"), use_gpu=True).use_gpu
+
+    def test_gpu_off_leaves_cuda_uninitialized(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the CUDA runtime is not queried unless use_gpu is set."""
+        device_count = Mock(return_value=1)
+        fake_cupy = SimpleNamespace(cuda=SimpleNamespace(runtime=SimpleNamespace(getDeviceCount=device_count)))
+        monkeypatch.setattr("embedding_server.vector_search.cupy", fake_cupy)
+
+        assert not VectorSearchDatabase(Path("dummy")).use_gpu
+        device_count.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("precision", list(STORAGE_DTYPES))
+    async def test_search_zero_vectors_score_zero(self, mock_embedding_service: Any, precision: str) -> None:
+        """Test zero-norm documents and queries score 0 instead of NaN."""
+        db = VectorSearchDatabase.from_arrays(
+            Path("dummy"),
+            ids=["zero", "unit"],
+            texts=["Zero", "Unit"],
+            embeddings=[[0.0] * 768, [1.0] + [0.0] * 767],
+            precision=precision,
+        )
+        db.embedding_service = mock_embedding_service
+        mock_embedding_service.embed.return_value = [3.0] + [0.0] * 767
+
+        results = await db.search("test query", top_k=2)
+
+        assert [(r[0], r[1]) for r in results] == [("unit", 1.0), ("zero", 0.0)]
+
+        mock_embedding_service.embed.return_value = [0.0] * 768
+        assert [r[1] for r in await db.search("zero query", top_k=2)] == [0.0, 0.0]
+
+    def test_unsupported_precision(self) -> None:
+        """Test an unknown storage precision is rejected."""
+        with pytest.raises(ValueError):
+            VectorSearchDatabase(Path("dummy"), precision="float8")
+
+    @pytest.mark.parametrize("top_k", [1, 3, 5, 10])
+    def test_top_k_indices(self, top_k: int) -> None:
+        """Test partial top-k selection matches a full descending sort."""
+        scores = np.array([0.1, 0.9, -0.3, 0.5, 0.7], dtype=np.float32)
+
+        top_idx = VectorSearchDatabase._top_k_indices(scores, top_k)
+
+        assert top_idx.tolist() == np.argsort(-scores)[:top_k].tolist()
+
+        batch = np.stack([scores, -scores])
+        assert VectorSearchDatabase._top_k_indices(batch, top_k).tolist() == [
+            np.argsort(-row)[:top_k].tolist() for row in batch
+        ]
+
     @pytest.mark.asyncio
     async def test_cosine_similarity(self) -> None:
         """Test cosine similarity calculation."""
@@ -91,7 +550,7 @@ class TestVectorSearchDatabase:
         assert abs(db._cosine_similarity(vec1, vec4) + 1.0) < 1e-6
 
     @pytest.mark.asyncio
-    async def test_retry_logic_success(self, test_db: VectorSearchDatabase) -> None:
+    async def test_retry_logic_success(self, test_db: VectorSearchDatabase, fake_sleep: list[float]) -> None:
         """Test retry logic succeeds after initial failures."""
         mock_embed = AsyncMock()
         mock_embed.side_effect = [
@@ -104,11 +563,28 @@ class TestVectorSearchDatabase:
 
         result = await test_db._get_embedding_with_retry("test", max_retries=3)
 
-        assert result == [0.5] * 768
+        assert np.array_equal(result, [0.5] * 768)
         assert mock_embed.call_count == 3
+        assert sum(fake_sleep) == sum(_RETRY_DELAYS[:2])
 
     @pytest.mark.asyncio
-    async def test_retry_logic_failure(self, test_db: VectorSearchDatabase) -> None:
+    async def test_float32_embedding_inserted_as_is(
+        self, test_db: VectorSearchDatabase, mock_embedding_service: Any
+    ) -> None:
+        """Test embeddings come back as read-only float32 arrays that insert accepts directly."""
+        test_db.embedding_service = mock_embedding_service
+
+        embedding = await test_db._get_embedding_with_retry("New entry", max_retries=1)
+
+        assert type(embedding) is np.ndarray and embedding.dtype == np.float32
+        assert embedding.flags.c_contiguous and not embedding.flags.writeable
+        await test_db.insert(text="New entry", embeddings=embedding)
+        assert test_db._texts[-1] == "New entry"
+        assert np.array_equal(test_db._embeddings[-1], embedding)
+        assert test_db._doc_matrix.dtype == np.float32  # no float64 matmul against the corpus
+
+    @pytest.mark.asyncio
+    async def test_retry_logic_failure(self, test_db: VectorSearchDatabase, fake_sleep: list[float]) -> None:
         """Test retry logic raises exception after max retries."""
         mock_embed = AsyncMock()
         mock_embed.side_effect = FlakyNetworkException("Network error")
@@ -119,9 +595,122 @@ class TestVectorSearchDatabase:
             await test_db._get_embedding_with_retry("test", max_retries=3)
 
         assert mock_embed.call_count == 3
+        assert fake_sleep == list(_RETRY_DELAYS[:2])  # no sleep after the last attempt
+
+    @pytest.mark.asyncio
+    async def test_query_embedding_cached(self, test_db: VectorSearchDatabase, mock_embedding_service: Any) -> None:
+        """Test a repeated query is embedded only once across top_k values."""
+        test_db.embedding_service = mock_embedding_service
+
+        await test_db.search("test query", top_k=1)
+        await test_db.search("test query", top_k=3)
+
+        assert mock_embedding_service.embed.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_query_embedding_cache_evicts_lru(self, mock_embedding_service: Any) -> None:
+        """Test the embedding cache keeps only the most recently used queries."""
+        db = VectorSearchDatabase(Path("dummy"), embedding_cache_size=2)
+        db.embedding_service = mock_embedding_service
+
+        for text in ["a", "b", "a", "c"]:
+            await db._get_embedding_with_retry(text, max_retries=1)
+
+        assert list(db._embedding_cache) == ["a", "c"]
+        assert mock_embedding_service.embed.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_search_batch_matches_search(self, tmp_path: Path, mock_embedding_service: Any) -> None:
+        """Test batch search returns the same rankings as one search per query."""
+        rng = np.random.default_rng(0)
+        db = VectorSearchDatabase.from_arrays(
+            tmp_path / "batch.json",
+            ids=[f"id{i}" for i in range(30)],
+            texts=[f"Text {i}" for i in range(30)],
+            embeddings=rng.standard_normal((30, 768)),
+        )
+        embeddings = {"a": rng.standard_normal(768).tolist(), "b": rng.standard_normal(768).tolist()}
+        mock_embedding_service.embed.side_effect = lambda text: embeddings[text]
+        mock_embedding_service.embed_batch = AsyncMock(
+            side_effect=lambda texts: [embeddings[text] for text in texts]
+        )
+        db.embedding_service = mock_embedding_service
+
+        batch = await db.search_batch(["a", "b"], top_k=5)
+
+        assert [[r[0] for r in results] for results in batch] == [
+            [r[0] for r in await db.search(text, top_k=5)] for text in ["a", "b"]
+        ]
+        mock_embedding_service.embed_batch.assert_awaited_once_with(["a", "b"])
+
+    @pytest.mark.asyncio
+    async def test_cached_search_reports_hits(self, test_db: VectorSearchDatabase, mock_embedding_service: Any) -> None:
+        """Test cached search returns the hit flag and reuses one key per query."""
+        db = CachedVectorSearchDatabase(test_db.cache_path)
+        await VectorSearchDatabase.setup(db)
+        db.embedding_service = mock_embedding_service
+        db.cache.get_by_key = AsyncMock(return_value=None)  # type: ignore[method-assign]
+        db.cache.set_by_key = AsyncMock()  # type: ignore[method-assign]
+
+        results, cache_hit = await db.search_with_cache_status("test query", top_k=2)
+
+        assert not cache_hit
+        key = db.cache.get_by_key.call_args.args[0]
+        db.cache.set_by_key.assert_awaited_once_with(key, results)
+
+        db.cache.get_by_key.return_value = results
+        assert await db.search_with_cache_status("test query", top_k=2) == (results, True)
+        assert await db.search("test query", top_k=2) == results
+
+        # A hit cancels the embedding started alongside the lookup
+        assert await db.search_with_cache_status("other query", top_k=2) == (results, True)
+        await asyncio.sleep(0.01)
+        assert mock_embedding_service.embed.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_finishes_cancelling_embedding(self, test_db: VectorSearchDatabase) -> None:
+        """Test a hit returns only once the embedding started alongside the lookup has stopped."""
+        db = CachedVectorSearchDatabase(test_db.cache_path)
+        await VectorSearchDatabase.setup(db)
+        cached = [("id1", 0.5, "Hello world")]
+        db.cache.get_by_key = AsyncMock(return_value=cached)  # type: ignore[method-assign]
+        events: list[str] = []
+
+        async def slow_embedding(text: str, max_retries: int) -> Any:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                events.append("cancelled")
+                raise
+
+        db._get_embedding_with_retry = slow_embedding  # type: ignore[method-assign,assignment]
+
+        assert await db.search_with_cache_status("test query", top_k=1) == (cached, True)
+        assert events == ["cancelled"]
+
+    @pytest.mark.asyncio
+    async def test_cached_search_batch_only_searches_misses(
+        self, test_db: VectorSearchDatabase, mock_embedding_service: Any
+    ) -> None:
+        """Test cached batch search serves hits and stores only the misses."""
+        db = CachedVectorSearchDatabase(test_db.cache_path)
+        await VectorSearchDatabase.setup(db)
+        db.embedding_service = mock_embedding_service
+        cached = [("id1", 0.5, "Hello world")]
+        db.cache.mget = AsyncMock(return_value=[cached, None])  # type: ignore[method-assign]
+        db.cache.mset = AsyncMock()  # type: ignore[method-assign]
+
+        results, hits = await db.search_batch_with_cache_status(["cached query", "new query"], top_k=2)
+
+        assert hits == [True, False]
+        assert results[0] == cached and len(results[1]) == 2
+        mock_embedding_service.embed.assert_awaited_once_with("new query")
+        db.cache.mset.assert_awaited_once_with([("new query", 2, results[1])])
+        db.cache.mget.return_value = [cached]
+        assert await db.search_batch(["cached query"], top_k=2) == [cached]
 
     @pytest.mark.asyncio
-    async def test_exponential_backoff(self, test_db: VectorSearchDatabase) -> None:
+    async def test_exponential_backoff(self, test_db: VectorSearchDatabase, fake_sleep: list[float]) -> None:
         """Test exponential backoff timing."""
         mock_embed = AsyncMock()
         mock_embed.side_effect = [
@@ -132,76 +721,125 @@ class TestVectorSearchDatabase:
 
         test_db.embedding_service.embed = mock_embed  # type: ignore[method-assign]
 
-        with patch('asyncio.sleep') as mock_sleep:
-            await test_db._get_embedding_with_retry("test", max_retries=3)
+        await test_db._get_embedding_with_retry("test", max_retries=3)
+
+        assert fake_sleep == [1, 2]  # 2^0, 2^1
+
+    @pytest.mark.asyncio
+    async def test_backoff_is_capped(self, test_db: VectorSearchDatabase, fake_sleep: list[float]) -> None:
+        """Test backoff delays stop growing at the configured maximum."""
+        mock_embed = AsyncMock()
+        mock_embed.side_effect = [FlakyNetworkException("Network error")] * 199 + [[0.5] * 768]
+
+        test_db.embedding_service.embed = mock_embed  # type: ignore[method-assign]
+        test_db._batcher.max_wait = 0  # each attempt would otherwise wait out a real batch window
 
-            # Check sleep was called with exponential backoff
-            assert mock_sleep.call_count == 2
-            mock_sleep.assert_any_call(1)  # 2^0
-            mock_sleep.assert_any_call(2)  # 2^1
+        await test_db._get_embedding_with_retry("test", max_retries=200, max_delay=10)
+
+        assert fake_sleep[:7] == [1, 2, 4, 8, 10, 10, 10]
+        assert sum(fake_sleep) == 1 + 2 + 4 + 8 + 10 * 195
 
 
 class TestSearchEndpoint:
     """Test cases for the /search endpoint."""
 
     @pytest.mark.asyncio
-    async def test_search_endpoint_success(self, tmp_path: Path, mock_embedding_service: Any) -> None:
+    async def test_search_endpoint_success(self, tmp_path: Path, mock_embedding_service: Any, client: AsyncClient) -> None:
         """Test successful search via API endpoint."""
         # Setup test database
         db_path = tmp_path / "test_api_embeddings.json"
-        test_data = pd.DataFrame({
+        test_data = {
             "ID": ["id1", "id2"],
             "Text": ["First document", "Second document"],
-            "Embeddings": [[0.1] * 768, [0.9] * 768]
-        })
-        test_data.to_json(db_path, index=False)
+            "Embeddings": FIXTURE_EMBEDDINGS[:2]
+        }
+        db_path.write_bytes(orjson.dumps(test_data, option=orjson.OPT_SERIALIZE_NUMPY))
 
         with patch('embedding_server.server.db_path', db_path):
             with patch('embedding_server.server.db') as mock_db:
-                mock_db.search = AsyncMock(return_value=[
+                mock_db.search_with_cache_status = AsyncMock(return_value=([
                     ("id2", 0.95, "Second document"),
                     ("id1", 0.85, "First document")
-                ])
+                ], False))
 
-                async with AsyncClient(app=app, base_url="http://test") as client:
-                    response = await client.post(
-                        "/search",
-                        json={"query": "test search", "top_k": 2}
-                    )
+                response = await client.post(
+                    "/search",
+                    json={"query": "test search", "top_k": 2}
+                )
 
         assert response.status_code == 200
         data = response.json()
         assert len(data["results"]) == 2
         assert data["results"][0]["score"] > data["results"][1]["score"]
+        assert data["cache_hit"] is False
 
     @pytest.mark.asyncio
-    async def test_search_endpoint_network_error(self) -> None:
+    async def test_search_batch_endpoint(self, client: AsyncClient) -> None:
+        """Test batch search returns one sorted result list per query."""
+        with patch('embedding_server.server.db') as mock_db:
+            mock_db.search_batch_with_cache_status = AsyncMock(return_value=([
+                [("id2", 0.95, "Second document"), ("id1", 0.85, "First document")],
+                [("id1", 0.75, "First document"), ("id2", 0.25, "Second document")],
+            ], [False, True]))
+
+            response = await client.post(
+                "/search_batch",
+                json={"queries": ["first search", "second search"], "top_k": 2}
+            )
+
+        assert response.status_code == 200
+        data = response.json()["results"]
+        assert len(data) == 2
+        for entry in data:
+            scores = [result["score"] for result in entry["results"]]
+            assert scores == sorted(scores, reverse=True)
+        assert [entry["cache_hit"] for entry in data] == [False, True]
+        mock_db.search_batch_with_cache_status.assert_called_once_with(
+            query_texts=["first search", "second search"], top_k=2, use_cache=True
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("count", [0, MAX_BATCH_QUERIES + 1])
+    async def test_search_batch_endpoint_bounds_queries(self, client: AsyncClient, count: int) -> None:
+        """Test batch search rejects empty and oversized batches before embedding them."""
+        with patch('embedding_server.server.db') as mock_db:
+            mock_db.search_batch_with_cache_status = AsyncMock()
+
+            response = await client.post(
+                "/search_batch",
+                json={"queries": [f"search {i}" for i in range(count)]}
+            )
+
+        assert response.status_code == 422
+        mock_db.search_batch_with_cache_status.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_search_endpoint_network_error(self, client: AsyncClient) -> None:
         """Test search endpoint handles network errors."""
-        with patch('embedding_server.server.db.search') as mock_search:
+        with patch('embedding_server.server.db.search_with_cache_status') as mock_search:
             mock_search.side_effect = FlakyNetworkException("Network error")
 
-            async with AsyncClient(app=app, base_url="http://test") as client:
-                response = await client.post(
-                    "/search",
-                    json={"query": "test search"}
-                )
+            response = await client.post(
+                "/search",
+                json={"query": "test search"}
+            )
 
         assert response.status_code == 503
         assert "Network error" in response.json()["detail"]
 
     @pytest.mark.asyncio
-    async def test_search_endpoint_default_top_k(self) -> None:
+    async def test_search_endpoint_default_top_k(self, client: AsyncClient) -> None:
         """Test search endpoint uses default top_k value."""
-        with patch('embedding_server.server.db.search') as mock_search:
-            mock_search.return_value = []
+        with patch('embedding_server.server.db.search_with_cache_status') as mock_search:
+            mock_search.return_value = ([], False)
 
-            async with AsyncClient(app=app, base_url="http://test") as client:
-                await client.post(
-                    "/search",
-                    json={"query": "test search"}  # No top_k specified
-                )
+            await client.post(
+                "/search",
+                json={"query": "test search"}  # No top_k specified
+            )
 
             mock_search.assert_called_once_with(
                 query_text="test search",
-                top_k=5  # Default value
+                top_k=5,  # Default value
+                use_cache=True
             )